@@ -6,13 +6,18 @@ Author: Security Tool for Ethical Pentesting
 """
 
 import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
 import re
+import sqlite3
 import sys
 import threading
 import time
 import random
 import urllib.parse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -25,16 +30,26 @@ except ImportError:
     sys.exit(1)
 
 try:
-    from bs4 import BeautifulSoup
+    import aiohttp
 except ImportError:
-    print("[!] Install: pip install beautifulsoup4 lxml")
-    sys.exit(1)
+    aiohttp = None
 
 class Config:
     DEFAULT_THREADS = 10
     TIMEOUT = 15
     MAX_RETRIES = 3
     OUTPUT_FILE = "output-craftjs.txt"
+    # async engine
+    CONNECTIONS = 1000
+    PER_HOST = 4
+    HOST_RATE = 2.0  # requests/s per host
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    DELAY = (0.3, 1.0)  # random sleep before each target (thread engine)
+    CHUNK_SIZE = 65536
+    # bodies worth scanning; anything else is dropped right after the headers
+    TEXT_TYPES = ("text/", "javascript", "ecmascript", "json", "xml")
+    # extraction pool: bodies waiting per worker process before network workers block
+    QUEUE_PER_WORKER = 4
     USER_AGENTS = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36",
@@ -77,15 +92,47 @@ class Patterns:
         "SendGrid": r'SG\.[a-zA-Z0-9_\-]{22}\.[a-zA-Z0-9_\-]{43}',
         "Twilio": r'SK[0-9a-fA-F]{32}',
     }
+    # Literal prefilter: pattern -> (literals, lead). Literals are lowercase (patterns run
+    # with re.I); a pattern is skipped when none occurs. With lead set, every match starts
+    # at most `lead` chars before a literal, so only those offsets are tried.
+    LITERALS = {
+        API_ROUTES[0]: (("/api/",), None),
+        API_ROUTES[1]: (("/v",), None),
+        API_ROUTES[2]: (("fetch",), 0),
+        API_ROUTES[3]: (("axios.",), 0),
+        API_ROUTES[4]: (("endpoint",), 0),
+        API_ROUTES[5]: (("baseurl",), 0),
+        EMAIL: (("@",), None),
+        CREDENTIALS[0]: (("password",), 1),
+        CREDENTIALS[1]: (("secret",), 1),
+        CREDENTIALS[2]: (("apikey", "api_key", "api-key"), 1),
+        CREDENTIALS[3]: (("authtoken", "auth_token", "auth-token"), 1),
+        CREDENTIALS[4]: (("authorization",), 0),
+        CLOUD_TOKENS["AWS Key"]: (("akia",), 0),
+        CLOUD_TOKENS["Google API"]: (("aiza",), 0),
+        CLOUD_TOKENS["GitHub Token"]: (("ghp_", "gho_", "ghu_", "ghs_", "ghr_"), 0),
+        CLOUD_TOKENS["Slack Token"]: (("xoxb-", "xoxa-", "xoxp-", "xoxr-", "xoxs-"), 0),
+        CLOUD_TOKENS["Stripe Key"]: (("sk_live_", "sk_test_"), 0),
+        CLOUD_TOKENS["JWT"]: (("eyj",), 0),
+        CLOUD_TOKENS["Private Key"]: (("-----begin ",), 0),
+        CLOUD_TOKENS["MongoDB URI"]: (("mongodb",), 0),
+        CLOUD_TOKENS["PostgreSQL"]: (("postgres",), 0),
+        CLOUD_TOKENS["S3 Bucket"]: ((".amazonaws.com",), None),
+        CLOUD_TOKENS["Discord Webhook"]: (("https://discord",), 0),
+        CLOUD_TOKENS["SendGrid"]: (("sg.",), 0),
+        CLOUD_TOKENS["Twilio"]: (("sk",), 0),
+    }
 
 class HTTPClient:
-    def __init__(self):
+    def __init__(self, http_cache=None):
+        self.http_cache = http_cache
         self.session = requests.Session()
         retry = Retry(total=Config.MAX_RETRIES, backoff_factor=1, status_forcelist=[429,500,502,503,504])
         self.session.mount("http://", HTTPAdapter(max_retries=retry))
         self.session.mount("https://", HTTPAdapter(max_retries=retry))
     
-    def _headers(self):
+    @staticmethod
+    def _headers():
         return {
             "User-Agent": random.choice(Config.USER_AGENTS),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -96,75 +143,278 @@ class HTTPClient:
             "Upgrade-Insecure-Requests": "1",
         }
     
-    def is_alive(self, url):
+    @staticmethod
+    def is_text(ctype):
+        ctype = (ctype or "").lower()
+        return not ctype or any(t in ctype for t in Config.TEXT_TYPES)
+    
+    @staticmethod
+    def decode(body, encoding):
+        # same fallback as requests' Response.text; compat.chardet is None when
+        # neither chardet nor charset_normalizer is installed
+        if encoding is None:
+            detector = requests.compat.chardet
+            encoding = (detector.detect(body)["encoding"] if detector else None) or "utf-8"
         try:
-            r = self.session.head(url, headers=self._headers(), timeout=Config.TIMEOUT, allow_redirects=True, verify=False)
-            return r.status_code < 500
-        except:
+            return body.decode(encoding, "replace")
+        except LookupError:
+            return body.decode("utf-8", "replace")
+    
+    @staticmethod
+    def validators(headers):
+        return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+    
+    def probe(self, url):
+        """One streamed GET: (alive, content, status, validators). content is None for
+        non-text bodies and for 304 answers to the cached validators."""
+        time.sleep(random.uniform(*Config.DELAY))
+        headers = self._headers()
+        if self.http_cache:
+            headers.update(self.http_cache.conditional(url))
+        try:
+            with self.session.get(url, headers=headers, timeout=Config.TIMEOUT, allow_redirects=True,
+                                  verify=False, stream=True) as r:
+                meta = self.validators(r.headers)
+                if r.status_code >= 500:
+                    return False, None, r.status_code, meta
+                if r.status_code == 304 or not self.is_text(r.headers.get("Content-Type")):
+                    return True, None, r.status_code, meta
+                body = b"".join(r.iter_content(Config.CHUNK_SIZE))
+                return True, self.decode(body, r.encoding), r.status_code, meta
+        except Exception as e:
+            return False, None, str(e), None
+
+class HttpCache:
+    """On-disk HTTP cache for repeat scans: ETag/Last-Modified per URL and the scan result
+    per body hash. Requests carry If-None-Match/If-Modified-Since, and a 304 reuses the
+    stored findings without downloading or scanning the body."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, hash TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS bodies (hash TEXT PRIMARY KEY, raw TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+    """
+    COMMIT_EVERY = 200
+    
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.stats = {"not_modified": 0}
+        # findings stored by another set of patterns are stale: start over
+        row = self.conn.execute("SELECT value FROM meta WHERE name='patterns'").fetchone()
+        if row is None or row[0] != self.fingerprint():
+            self.conn.executescript("DELETE FROM urls; DELETE FROM bodies;")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('patterns', ?)", (self.fingerprint(),))
+            self.conn.commit()
+    
+    @staticmethod
+    def fingerprint():
+        source = repr((Patterns.API_ROUTES, Patterns.EMAIL, Patterns.IPV4, Patterns.CREDENTIALS,
+                       Patterns.SUBDOMAIN, sorted(Patterns.CLOUD_TOKENS.items())))
+        return hashlib.sha256(source.encode()).hexdigest()[:16]
+    
+    def conditional(self, url):
+        """Validator headers for url (only when its findings are still stored)."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT u.etag, u.last_modified FROM urls u JOIN bodies b ON b.hash = u.hash WHERE u.url = ?",
+                (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+    
+    def url_hash(self, url):
+        with self.lock:
+            row = self.conn.execute("SELECT hash FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+    
+    def remember(self, url, meta, key):
+        if not meta or not (meta.get("etag") or meta.get("last_modified")):
+            return
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)",
+                              (url, meta.get("etag"), meta.get("last_modified"), key))
+            self._wrote()
+    
+    def load(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT raw FROM bodies WHERE hash = ?", (key,)).fetchone()
+        return [tuple(f) for f in json.loads(row[0])] if row else None
+    
+    def store(self, key, raw):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO bodies VALUES (?, ?)", (key, json.dumps(raw)))
+            self._wrote()
+    
+    def _wrote(self):
+        self.writes += 1
+        if self.writes % self.COMMIT_EVERY == 0:
+            self.conn.commit()
+    
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+class HostLimiter:
+    """Per-host concurrency cap and request spacing (replaces the global random sleep)."""
+    def __init__(self, per_host, rate):
+        self.per_host = per_host
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.slots = {}
+        self.next_at = {}
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        host = urllib.parse.urlparse(url).netloc.lower()
+        sem = self.slots.get(host)
+        if sem is None:
+            sem = self.slots[host] = asyncio.Semaphore(self.per_host)
+        async with sem:
+            if self.interval:
+                now = time.monotonic()
+                at = max(now, self.next_at.get(host, 0))
+                self.next_at[host] = at + self.interval
+                if at > now:
+                    await asyncio.sleep(at - now)
+            yield
+
+class AsyncHTTPClient:
+    """aiohttp counterpart of HTTPClient (same headers, retries and liveness rule)."""
+    def __init__(self, session, limiter, http_cache=None):
+        self.session = session
+        self.limiter = limiter
+        self.http_cache = http_cache
+    
+    def _headers(self):
+        h = HTTPClient._headers()
+        h["Accept-Encoding"] = "gzip, deflate"  # aiohttp decodes br only with brotli installed
+        return h
+    
+    async def _get(self, url):
+        headers = self._headers()
+        if self.http_cache:
+            headers.update(self.http_cache.conditional(url))
+        for attempt in range(Config.MAX_RETRIES + 1):
+            last = attempt == Config.MAX_RETRIES
             try:
-                r = self.session.get(url, headers=self._headers(), timeout=Config.TIMEOUT, allow_redirects=True, verify=False)
-                return r.status_code < 500
-            except:
-                return False
+                async with self.limiter.slot(url):
+                    async with self.session.get(url, headers=headers, allow_redirects=True) as r:
+                        if r.status in Config.RETRY_STATUS and not last:
+                            raise aiohttp.ClientResponseError(r.request_info, r.history, status=r.status)
+                        meta = HTTPClient.validators(r.headers)
+                        if r.status >= 500:
+                            return False, None, r.status, meta
+                        if r.status == 304 or not HTTPClient.is_text(r.headers.get("Content-Type")):
+                            return True, None, r.status, meta
+                        chunks = [c async for c in r.content.iter_chunked(Config.CHUNK_SIZE)]
+                        encoding = requests.utils.get_encoding_from_headers(r.headers)
+                        return True, HTTPClient.decode(b"".join(chunks), encoding), r.status, meta
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if last:
+                    raise
+            await asyncio.sleep(2 ** attempt)
     
-    def fetch(self, url):
-        time.sleep(random.uniform(0.3, 1.0))
+    async def probe(self, url):
+        """One streamed GET: (alive, content, status, validators), like HTTPClient.probe."""
         try:
-            r = self.session.get(url, headers=self._headers(), timeout=Config.TIMEOUT, allow_redirects=True, verify=False)
-            return r.text, r.status_code
+            return await self._get(url)
         except Exception as e:
-            return None, str(e)
+            return False, None, str(e), None
 
 class Extractor:
+    # chars re.I equates with ASCII letters that str.lower() leaves alone
+    FOLD = str.maketrans({"\u017f": "s", "\u0131": "i", "\u0130": "i"})
+    
     def extract(self, content, url):
+        return self.attribute(self.scan(content), url)
+    
+    def scan(self, content):
+        """URL-independent pass: [(type, value)], with Subdomain candidates still unfiltered
+        so the result can be reused for the same body served by another target."""
         findings = []
-        full = self._expand(content)
+        # inline <script> bodies are already part of the raw page: scan each byte once
+        full = content
+        low = self._fold(full)
         
         for p in Patterns.API_ROUTES:
-            for m in re.finditer(p, full, re.I):
+            for m in self._finditer(p, full, low):
                 v = m.group(1) if m.lastindex else m.group(0)
-                findings.append(("API Route", v.strip('"\''), url))
+                findings.append(("API Route", v.strip('"\'')))
         
-        for m in re.finditer(Patterns.EMAIL, full, re.I):
+        for m in self._finditer(Patterns.EMAIL, full, low):
             e = m.group(0)
             if not any(x in e.lower() for x in ['example.com','test.com','domain.com']):
-                findings.append(("Email", e, url))
+                findings.append(("Email", e))
         
-        for m in re.finditer(Patterns.IPV4, full):
+        for m in self._finditer(Patterns.IPV4, full, low, 0):
             ip = m.group(0)
             if not self._is_private(ip):
-                findings.append(("IPv4", ip, url))
+                findings.append(("IPv4", ip))
         
         for p in Patterns.CREDENTIALS:
-            for m in re.finditer(p, full, re.I):
+            for m in self._finditer(p, full, low):
                 v = m.group(1) if m.lastindex else m.group(0)
                 if len(v) >= 3 and not self._placeholder(v):
-                    findings.append(("Credential", v, url))
+                    findings.append(("Credential", v))
         
-        base = self._base_domain(url)
-        for m in re.finditer(Patterns.SUBDOMAIN, full, re.I):
+        for m in self._finditer(Patterns.SUBDOMAIN, full, low):
             s = m.group(0).lower().replace('https://','').replace('http://','')
-            if base and base in s and s != base:
-                findings.append(("Subdomain", s, url))
+            findings.append(("Subdomain", s))
         
         for name, p in Patterns.CLOUD_TOKENS.items():
-            for m in re.finditer(p, full, re.I):
+            for m in self._finditer(p, full, low):
                 v = m.group(1) if m.lastindex and m.lastindex >= 1 else m.group(0)
                 if not self._placeholder(v):
-                    findings.append((f"Token/{name}", v[:100], url))
+                    findings.append((f"Token/{name}", v[:100]))
         
         return self._dedup(findings)
     
-    def _expand(self, content):
-        try:
-            soup = BeautifulSoup(content, 'lxml')
-            all_c = content
-            for s in soup.find_all('script'):
-                if s.string:
-                    all_c += "\n" + s.string
-            return all_c
-        except:
-            return content
+    def attribute(self, raw, url):
+        """Findings of a scan() result for one URL: subdomains of its base domain only."""
+        base = self._base_domain(url)
+        return [(t, v, url) for t, v in raw if t != "Subdomain" or (base and base in v and v != base)]
+    
+    def _fold(self, full):
+        low = full.translate(self.FOLD).lower()
+        # offsets must line up with the original text
+        return low if len(low) == len(full) else None
+    
+    def _finditer(self, pattern, full, low, flags=re.I):
+        rx = re.compile(pattern, flags)
+        spec = Patterns.LITERALS.get(pattern)
+        if spec is None or low is None:
+            return rx.finditer(full)
+        literals, lead = spec
+        if not any(lit in low for lit in literals):
+            return ()
+        if lead is None:
+            return rx.finditer(full)
+        return self._around(rx, full, low, literals, lead)
+    
+    @staticmethod
+    def _around(rx, full, low, literals, lead):
+        """Same matches as rx.finditer(full), trying only offsets near the literals."""
+        starts = set()
+        for lit in literals:
+            i = low.find(lit)
+            while i != -1:
+                starts.update(range(max(0, i - lead), i + 1))
+                i = low.find(lit, i + 1)
+        end = 0
+        for i in sorted(starts):
+            if i < end:
+                continue
+            m = rx.match(full, i)
+            if m:
+                end = m.end()
+                yield m
     
     def _is_private(self, ip):
         p = ip.split('.')
@@ -195,14 +445,198 @@ class Extractor:
                 u.append(i)
         return u
 
+_worker_extractor = None
+
+def _extract_job(content):
+    """Runs in the extraction processes: (Extractor.scan result, seconds busy)."""
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = Extractor()
+    start = time.perf_counter()
+    raw = _worker_extractor.scan(content)
+    return raw, time.perf_counter() - start
+
+class ContentCache:
+    """Scan results per body hash. Identical bodies (vendor bundles shared by many
+    targets) are scanned once and reused; known library hashes are skipped outright."""
+    def __init__(self, known=(), store=None):
+        self.known = set(known)
+        self.store = store
+        self.raw = {}
+        self.waiting = {}
+        self.lock = threading.Lock()
+        self.stats = {"reused": 0, "known": 0, "bytes_scanned": 0, "bytes_saved": 0}
+    
+    @staticmethod
+    def digest(content):
+        data = content.encode("utf-8", "replace")
+        return hashlib.sha256(data).hexdigest(), len(data)
+    
+    @staticmethod
+    def load_known(path):
+        """sha256sum-style file: first field of each line is the hex digest."""
+        known = set()
+        with open(path, 'r') as f:
+            for line in f:
+                field = line.split('#', 1)[0].split()
+                if field and len(field[0]) == 64:
+                    known.add(field[0].lower())
+        return known
+    
+    def claim(self, key, url, size):
+        """"known", "hit" (with the cached scan), "wait" (same body being scanned now,
+        url is attributed when it finishes) or "miss" (caller scans and calls fill)."""
+        with self.lock:
+            if key in self.known:
+                self.stats["known"] += 1
+                self.stats["bytes_saved"] += size
+                return "known", None
+            if key not in self.raw and self.store:
+                # scanned in an earlier run (same body under another URL or without validators)
+                raw = self.store.load(key)
+                if raw is not None:
+                    self.raw[key] = raw
+            if key in self.raw:
+                self.stats["reused"] += 1
+                self.stats["bytes_saved"] += size
+                return "hit", self.raw[key]
+            if key in self.waiting:
+                self.waiting[key].append(url)
+                self.stats["reused"] += 1
+                self.stats["bytes_saved"] += size
+                return "wait", None
+            self.waiting[key] = []
+            self.stats["bytes_scanned"] += size
+            return "miss", None
+    
+    def fill(self, key, raw):
+        """Stores a scan result (None = scan failed, not cached); returns the waiting URLs."""
+        with self.lock:
+            if raw is not None:
+                self.raw[key] = raw
+                if self.store:
+                    self.store.store(key, raw)
+            return self.waiting.pop(key, [])
+
+class ExtractionPool:
+    """Process pool for Extractor.scan behind a bounded queue, so the regex scan
+    runs outside the GIL of the network workers. Tracks how busy the processes are
+    and how long producers waited on a full queue."""
+    def __init__(self, workers, depth, on_result):
+        self.workers = workers
+        self.depth = depth or workers * Config.QUEUE_PER_WORKER
+        self.on_result = on_result
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(self.depth)
+        self.async_slots = None
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.finished = None
+        self.stats = {"jobs": 0, "errors": 0, "busy": 0.0, "blocked": 0.0, "pending": 0, "max_pending": 0}
+    
+    def _enqueue(self, content, url, key, release, waited):
+        with self.lock:
+            self.stats["blocked"] += waited
+            self.stats["pending"] += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], self.stats["pending"])
+        try:
+            fut = self.executor.submit(_extract_job, content)
+        except Exception:
+            # broken or shut-down pool: undo the slot and release the URLs parked on this body
+            with self.lock:
+                self.stats["pending"] -= 1
+            release()
+            self.on_result(key, url, None)
+            raise
+        fut.add_done_callback(lambda f: self._done(url, key, f, release, content))
+    
+    def submit(self, content, url, key):
+        """Queues a body; blocks while the queue is full."""
+        start = time.monotonic()
+        self.slots.acquire()
+        self._enqueue(content, url, key, self.slots.release, time.monotonic() - start)
+    
+    async def submit_async(self, content, url, key):
+        """submit() for the event loop: waits for a slot without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        if self.async_slots is None:
+            self.async_slots = asyncio.Semaphore(self.depth)
+        start = time.monotonic()
+        await self.async_slots.acquire()
+        release = lambda: loop.call_soon_threadsafe(self.async_slots.release)
+        self._enqueue(content, url, key, release, time.monotonic() - start)
+    
+    def _done(self, url, key, fut, release, content):
+        with self.lock:
+            self.stats["pending"] -= 1
+        release()
+        try:
+            raw, busy = fut.result()
+        except Exception as e:
+            with self.lock:
+                self.stats["errors"] += 1
+            print(f"[!] Extract error: {url}: {e}")
+            # the body goes back so the caller can retry it for the URLs waiting on it
+            self.on_result(key, url, None, content)
+            return
+        with self.lock:
+            self.stats["jobs"] += 1
+            self.stats["busy"] += busy
+        self.on_result(key, url, raw)
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.finished is None:
+            self.finished = time.monotonic()
+    
+    def utilization(self):
+        wall = (self.finished or time.monotonic()) - self.started
+        return self.stats["busy"] / (self.workers * wall) if wall > 0 else 0.0
+
+class FindingStream:
+    """Append-only JSONL of findings, flushed per URL: survives a crash, can be
+    tailed during the scan and keeps findings out of memory."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'w', encoding='utf-8')
+    
+    def write(self, findings):
+        lines = ''.join(json.dumps({"type": t, "data": d, "url": u}, ensure_ascii=False) + '\n'
+                        for t, d, u in findings)
+        with self.lock:
+            self.file.write(lines)
+            self.file.flush()
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
+    
+    def read(self):
+        """Yields (type, data, url); a line cut short by a crash is skipped."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                yield item["type"], item["data"], item["url"]
+
 class Scanner:
-    def __init__(self, threads):
+    def __init__(self, threads, extract_workers=0, queue=0, known_hashes=(), http_cache=None, stream=None):
         self.threads = threads
-        self.client = HTTPClient()
+        self.http_cache = http_cache
+        self.client = HTTPClient(http_cache)
         self.extractor = Extractor()
-        self.results = []
+        self.stream = stream
         self.lock = threading.Lock()
-        self.stats = {"total": 0, "alive": 0, "scanned": 0, "findings": 0}
+        self.stats = {"total": 0, "alive": 0, "skipped": 0, "scanned": 0, "findings": 0}
+        self.extract_workers = extract_workers
+        self.queue = queue
+        self.pool = None
+        self.net_workers = threads
+        self.net_busy = 0.0
+        self.cache = ContentCache(known_hashes, http_cache)
     
     def load(self, f):
         urls = []
@@ -217,38 +651,216 @@ class Scanner:
     
     def scan(self, url):
         print(f"[*] Checking: {url}")
-        if not self.client.is_alive(url):
-            print(f"[-] Offline: {url}")
-            return
+        start = time.monotonic()
+        result = self.client.probe(url)
         with self.lock:
-            self.stats["alive"] += 1
-        print(f"[+] Alive: {url}")
-        content, _ = self.client.fetch(url)
+            self.net_busy += time.monotonic() - start
+        content = self.triage(url, *result)
         if not content:
             return
+        key = self.claim(content, url, result[3])
+        if key is None:
+            return
+        if self.pool:
+            self.pool.submit(content, url, key)
+            return
+        raw = None
+        try:
+            raw = self.extractor.scan(content)
+        finally:
+            # always releases the URLs parked on this body, even if the scan raised
+            self.scanned(key, url, raw)
+    
+    def claim(self, content, url, meta=None):
+        """Content-hash dedup; returns the key to scan under, or None if already handled."""
+        key, size = ContentCache.digest(content)
+        if self.http_cache:
+            self.http_cache.remember(url, meta, key)
+        state, raw = self.cache.claim(key, url, size)
+        if state == "known":
+            print(f"[=] Known library, skipped: {url}")
+        elif state == "hit":
+            self.record(url, self.extractor.attribute(raw, url))
+        elif state == "miss":
+            return key
+        return None
+    
+    def scanned(self, key, url, raw, content=None):
+        """Attributes a fresh scan to its URL and to every URL that served the same body.
+        A failed pool scan (raw None, body given back) is retried once in this thread;
+        if there is no result, the waiting URLs are reported instead of dropped."""
+        if raw is None and content is not None:
+            try:
+                raw = self.extractor.scan(content)
+            except Exception as e:
+                print(f"[!] Extract retry failed: {url}: {e}")
+        waiting = self.cache.fill(key, raw)
+        if raw is None:
+            with self.lock:
+                self.stats["extract_errors"] = self.stats.get("extract_errors", 0) + 1 + len(waiting)
+            for u in waiting:
+                print(f"[!] Not scanned (same body failed): {u}")
+            return
+        for u in [url] + waiting:
+            self.record(u, self.extractor.attribute(raw, u))
+    
+    def triage(self, url, alive, content, status, meta=None):
+        """Counts the probe result; returns the content to scan, if any."""
+        if not alive:
+            print(f"[-] Offline: {url}")
+            return None
+        if status == 304 and self.http_cache:
+            self.not_modified(url)
+            return None
+        with self.lock:
+            self.stats["alive"] += 1
+            if content is None:
+                self.stats["skipped"] += 1
+            elif content:
+                self.stats["scanned"] += 1
+        print(f"[+] Alive: {url}" if content is not None else f"[+] Alive (non-text, skipped): {url}")
+        return content
+    
+    def not_modified(self, url):
+        """304 to our validators: findings come from the stored scan of the cached body."""
+        raw = self.http_cache.load(self.http_cache.url_hash(url) or "")
         with self.lock:
-            self.stats["scanned"] += 1
-        findings = self.extractor.extract(content, url)
+            self.stats["alive"] += 1
+            self.stats["not_modified"] = self.stats.get("not_modified", 0) + 1
+        print(f"[=] Not modified: {url}")
+        if raw is not None:
+            self.record(url, self.extractor.attribute(raw, url))
+    
+    def record(self, url, findings):
         with self.lock:
             self.stats["findings"] += len(findings)
-            self.results.extend(findings)
+        if self.stream and findings:
+            self.stream.write(findings)
         print(f"[+] Found {len(findings)} items: {url}")
     
+    def start_pool(self):
+        if self.extract_workers > 0:
+            self.pool = ExtractionPool(self.extract_workers, self.queue, self.scanned)
+            print(f"[*] Extraction: {self.extract_workers} processes, queue {self.pool.depth}")
+    
+    def finish(self, started):
+        """Drains the extraction pool and reports how busy each stage was."""
+        net_wall = time.monotonic() - started
+        if self.pool:
+            self.pool.close()
+        if self.http_cache:
+            self.http_cache.close()
+            print(f"\n[*] HTTP cache: {self.stats.get('not_modified', 0)} not modified (304), "
+                  f"findings reused from {self.http_cache.path}")
+        cs = self.cache.stats
+        if cs["reused"] or cs["known"]:
+            self.stats["bytes_saved"] = cs["bytes_saved"]
+            total = cs["bytes_saved"] + cs["bytes_scanned"]
+            print(f"\n[*] Content cache: {cs['reused']} bodies reused, {cs['known']} known libraries skipped, "
+                  f"{cs['bytes_saved'] / 1e6:.1f} MB of {total / 1e6:.1f} MB not scanned "
+                  f"({cs['bytes_saved'] / total:.0%})")
+        if not self.pool or net_wall <= 0:
+            return
+        ps = self.pool.stats
+        self.stats["net_util"] = round(self.net_busy / (self.net_workers * net_wall), 3)
+        self.stats["extract_util"] = round(self.pool.utilization(), 3)
+        self.stats["queue_blocked_s"] = round(ps["blocked"], 2)
+        print(f"\n[*] Network: {self.net_workers} workers, {self.stats['net_util']:.0%} busy, "
+              f"{ps['blocked']:.1f}s blocked on full queue")
+        print(f"[*] Extraction: {self.pool.workers} processes, {self.stats['extract_util']:.0%} busy, "
+              f"{ps['jobs']} jobs, queue peak {ps['max_pending']}/{self.pool.depth}")
+    
     def run(self, urls):
         self.stats["total"] = len(urls)
         print(f"\n[*] Scanning {len(urls)} URLs with {self.threads} threads\n")
+        self.start_pool()
+        started = time.monotonic()
         with ThreadPoolExecutor(max_workers=self.threads) as ex:
             futures = [ex.submit(self.scan, u) for u in urls]
             for f in as_completed(futures):
                 try: f.result()
                 except Exception as e: print(f"[!] Error: {e}")
+        self.finish(started)
     
     def save(self, out):
+        """Renders the text report from the findings stream, one line at a time.
+        Without a stream no findings were kept, so only the stats are written."""
+        if self.stream:
+            self.stream.close()
         with open(out, 'w') as f:
             f.write(f"# Bird-CraftJS - {datetime.now()}\n# Stats: {self.stats}\n\n")
-            for t, d, u in self.results:
-                f.write(f"TITULO: {t}\nDADO: {d}\nURL: {u}\n\n")
-        print(f"\n[+] Saved: {out}")
+            if self.stream:
+                for t, d, u in self.stream.read():
+                    f.write(f"TITULO: {t}\nDADO: {d}\nURL: {u}\n\n")
+        print(f"\n[+] Saved: {out}" + (f" (stream: {self.stream.path})" if self.stream else ""))
+
+class AsyncScanner(Scanner):
+    """asyncio engine: one event loop drives thousands of connections, limited per host."""
+    def __init__(self, connections, per_host, rate, extract_workers=0, queue=0, known_hashes=(), http_cache=None,
+                 stream=None):
+        super().__init__(connections, extract_workers, queue, known_hashes, http_cache, stream)
+        self.connections = connections
+        self.per_host = per_host
+        self.rate = rate
+    
+    async def scan_async(self, client, url):
+        print(f"[*] Checking: {url}")
+        start = time.monotonic()
+        result = await client.probe(url)
+        self.net_busy += time.monotonic() - start
+        content = self.triage(url, *result)
+        if not content:
+            return
+        key = self.claim(content, url, result[3])
+        if key is None:
+            return
+        if self.pool:
+            await self.pool.submit_async(content, url, key)
+            return
+        # regex work leaves the loop so it keeps serving sockets
+        raw = None
+        try:
+            raw = await asyncio.get_running_loop().run_in_executor(None, self.extractor.scan, content)
+        finally:
+            self.scanned(key, url, raw)
+    
+    async def _run(self, urls):
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=self.per_host,
+                                         ssl=False, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=Config.TIMEOUT)
+        queue = asyncio.Queue(maxsize=self.connections * 2)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            client = AsyncHTTPClient(session, HostLimiter(self.per_host, self.rate), self.http_cache)
+            
+            async def worker():
+                while True:
+                    url = await queue.get()
+                    if url is None:
+                        return
+                    try:
+                        await self.scan_async(client, url)
+                    except Exception as e:
+                        print(f"[!] Error: {e}")
+            
+            self.net_workers = max(1, min(self.connections, len(urls)))
+            workers = [asyncio.create_task(worker()) for _ in range(self.net_workers)]
+            for u in urls:
+                await queue.put(u)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            if self.pool:
+                # drain while the loop is alive: slot releases are scheduled on it
+                await asyncio.get_running_loop().run_in_executor(None, self.pool.close)
+    
+    def run(self, urls):
+        self.stats["total"] = len(urls)
+        print(f"\n[*] Scanning {len(urls)} URLs with {self.connections} connections "
+              f"(async, {self.per_host}/host, {self.rate} req/s/host)\n")
+        self.start_pool()
+        started = time.monotonic()
+        asyncio.run(self._run(urls))
+        self.finish(started)
 
 def main():
     print("\n🦅 BIRD-CRAFTJS - Web Source Analyzer\n")
@@ -256,8 +868,29 @@ def main():
     p.add_argument('-f', '--file', required=True, help='URLs file')
     p.add_argument('-t', '--threads', type=int, default=10, help='Threads (default: 10)')
     p.add_argument('-o', '--output', default='output-craftjs.txt', help='Output file')
+    p.add_argument('--stream', metavar='FILE',
+                   help='JSONL written as findings arrive, tail it live (default: output with .jsonl)')
+    p.add_argument('--async', dest='use_async', action='store_true', help='asyncio engine (needs aiohttp)')
+    p.add_argument('-c', '--connections', type=int, default=Config.CONNECTIONS,
+                   help=f'Async: concurrent connections (default: {Config.CONNECTIONS})')
+    p.add_argument('--per-host', type=int, default=Config.PER_HOST,
+                   help=f'Async: concurrent requests per host (default: {Config.PER_HOST})')
+    p.add_argument('--rate', type=float, default=Config.HOST_RATE,
+                   help=f'Async: requests/s per host, 0 = unlimited (default: {Config.HOST_RATE})')
+    p.add_argument('-w', '--extract-workers', type=int, default=0,
+                   help='Extraction processes, 0 = extract in the network workers (default: 0)')
+    p.add_argument('--queue', type=int, default=0,
+                   help=f'Bodies queued for extraction before network workers block '
+                        f'(default: {Config.QUEUE_PER_WORKER} per process)')
+    p.add_argument('--known-hashes', help='sha256sum-style list of library bodies to skip (e.g. jquery.min.js)')
+    p.add_argument('--http-cache', metavar='FILE',
+                   help='On-disk cache (SQLite) of ETag/Last-Modified and findings for repeat scans')
     a = p.parse_args()
     
+    if a.use_async and aiohttp is None:
+        print("[!] Install: pip install aiohttp")
+        sys.exit(1)
+    
     if not Path(a.file).exists():
         print(f"[!] File not found: {a.file}")
         sys.exit(1)
@@ -265,12 +898,23 @@ def main():
     import urllib3
     urllib3.disable_warnings()
     
-    s = Scanner(a.threads)
+    known = ContentCache.load_known(a.known_hashes) if a.known_hashes else ()
+    http_cache = HttpCache(a.http_cache) if a.http_cache else None
+    stream_path = Path(a.stream or Path(a.output).with_suffix('.jsonl'))
+    if stream_path.resolve() == Path(a.output).resolve():
+        print("[!] --stream and --output must be different files")
+        sys.exit(1)
+    stream = FindingStream(stream_path)
+    if a.use_async:
+        s = AsyncScanner(a.connections, a.per_host, a.rate, a.extract_workers, a.queue, known, http_cache, stream)
+    else:
+        s = Scanner(a.threads, a.extract_workers, a.queue, known, http_cache, stream)
     urls = s.load(a.file)
     if not urls:
         print("[!] No URLs found")
         sys.exit(1)
     
+    print(f"[*] Findings stream: {stream.path}")
     s.run(urls)
     s.save(a.output)
     print(f"\n[*] Done! Total:{s.stats['total']} Alive:{s.stats['alive']} Findings:{s.stats['findings']}")
@@ -4,11 +4,16 @@
 import requests
 import re
 import argparse
+import base64
+import codecs
+import json
+import os
 import sys
 import threading
 import time
 import random
-from urllib.parse import urlparse, urljoin
+import queue
+from urllib.parse import urlparse, urljoin, urlunparse, unquote
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from colorama import Fore, Style, init
@@ -26,6 +31,21 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0"
 ]
 
+# Crawl: profundidade máxima de links <a>/<link> a partir de cada alvo (scripts são
+# sempre seguidos) e teto de URLs por execução para não explodir em sites grandes
+MAX_DEPTH = 2
+MAX_URLS = 5000
+
+# Extensões que não valem o download (não contêm código nem links)
+SKIP_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.bmp', '.woff', '.woff2', '.ttf', '.eot',
+    '.otf', '.mp4', '.mp3', '.webm', '.avi', '.mov', '.pdf', '.zip', '.gz', '.rar', '.7z', '.exe', '.dmg',
+)
+
+# Source maps: comentário no fim do bundle/CSS que aponta o .map (ou um data: URI inline)
+SOURCE_MAP_COMMENT = re.compile(r'(?://|/\*)[#@]\s*sourceMappingURL=(\S+?)(?:\s*\*/)?\s*$')
+SOURCE_MAP_CHUNK = 65536
+
 # Dicionário de Regex categorizado (O "Cérebro" da ferramenta)
 PATTERNS = {
     # INFRAESTRUTURA & CONECTIVIDADE
@@ -102,14 +122,174 @@ PATTERNS = {
     }
 }
 
+class SourceMapReader:
+    """
+    Leitor em streaming de source maps (JSON v3). Percorre o objeto a partir
+    de pedaços de texto sem montá-lo inteiro: "mappings" e demais campos são
+    pulados sem acumular, e cada item de "sourcesContent" é entregue assim
+    que termina de chegar, de modo que só um arquivo original fica em memória
+    por vez. Levanta ValueError se o corpo não for um source map válido.
+    """
+    SPECIAL = re.compile(r'["\\]')
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buf = ''
+        self.pos = 0
+        self.sources = []
+        self.source_root = ''
+
+    def source_name(self, index):
+        """Caminho original do índice (ou sources[i] se a lista não chegou)."""
+        if index < len(self.sources) and self.sources[index]:
+            root = self.source_root
+            if root and not root.endswith('/'):
+                root += '/'
+            return root + self.sources[index]
+        return f"sources[{index}]"
+
+    def _more(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+        # Descarta o que já foi consumido: o buffer nunca passa de um pedaço
+        # mais o token em andamento
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """Próximo caractere não branco, sem consumir."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                raise ValueError("source map truncado")
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"esperado '{char}', encontrado '{found}'")
+        self.pos += 1
+
+    def _string(self, keep=True):
+        """Consome uma string JSON. Devolve o texto decodificado (ou None se keep=False)."""
+        self._expect('"')
+        parts = []
+        while True:
+            match = self.SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                if keep:
+                    parts.append(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                if not self._more():
+                    raise ValueError("string não terminada")
+                continue
+            end = match.start()
+            if self.buf[end] == '"':
+                if keep:
+                    parts.append(self.buf[self.pos:end])
+                self.pos = end + 1
+                return json.loads('"' + ''.join(parts) + '"') if keep else None
+            # Escape cortado entre dois pedaços: espera o resto antes de consumir
+            left = len(self.buf) - end
+            if left < 2 or (self.buf[end + 1] == 'u' and left < 6):
+                if keep:
+                    parts.append(self.buf[self.pos:end])
+                self.pos = end
+                if not self._more():
+                    raise ValueError("string não terminada")
+                continue
+            size = 6 if self.buf[end + 1] == 'u' else 2
+            if keep:
+                parts.append(self.buf[self.pos:end + size])
+            self.pos = end + size
+
+    def _skip_value(self):
+        char = self._peek()
+        if char == '"':
+            self._string(keep=False)
+        elif char in '[{':
+            depth = 0
+            while True:
+                char = self._peek()
+                if char == '"':
+                    self._string(keep=False)
+                    continue
+                self.pos += 1
+                if char in '[{':
+                    depth += 1
+                elif char in ']}':
+                    depth -= 1
+                    if depth == 0:
+                        return
+        else:
+            # Número, true, false ou null
+            while self._peek() not in ',]}':
+                self.pos += 1
+
+    def _items(self):
+        """Itera (índice, string ou None) de um array."""
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            if self._peek() == '"':
+                yield index, self._string()
+            else:
+                self._skip_value()
+                yield index, None
+            index += 1
+            if self._peek() == ']':
+                self.pos += 1
+                return
+            self._expect(',')
+
+    def __iter__(self):
+        """Itera (índice, conteúdo) de cada arquivo original presente em sourcesContent."""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._string()
+            self._expect(':')
+            if key == 'sourcesContent' and self._peek() == '[':
+                for index, content in self._items():
+                    if content:
+                        yield index, content
+            elif key == 'sources' and self._peek() == '[':
+                self.sources = [name or '' for _, name in self._items()]
+            elif key == 'sourceRoot' and self._peek() == '"':
+                self.source_root = self._string()
+            else:
+                self._skip_value()
+            if self._peek() == '}':
+                return
+            self._expect(',')
+
+
 class BirdCraftScanner:
-    def __init__(self, input_file, threads=7, output_file="output-craftjs.txt"):
+    def __init__(self, input_file, threads=7, output_file="output-craftjs.txt", max_depth=MAX_DEPTH,
+                 max_urls=MAX_URLS, stream_file=None):
         self.input_file = input_file
         self.output_file = output_file
+        # Achados vão para um JSONL à medida que aparecem (dá para acompanhar com tail -f);
+        # o relatório texto é gerado a partir dele no fim
+        self.stream_file = stream_file or os.path.splitext(output_file)[0] + '.jsonl'
+        self.stream = None
+        self.finding_count = 0
         self.threads = threads
-        self.visited_urls = set()
+        self.max_depth = max_depth
+        self.max_urls = max_urls
+        self.visited_urls = set() # URLs já enfileiradas (normalizadas), nunca buscadas duas vezes
         self.urls_to_scan = set()
-        self.findings = {} # Chave: "Finding_Signature", Valor: {info, type, exploit, urls: []}
+        self.frontier = queue.Queue() # Fila BFS compartilhada: (url, profundidade)
+        self.crawl_stats = {"pages": 0, "scripts": 0, "maps": 0, "sources": 0, "max_depth": 0, "dropped": 0}
+        self.source_maps = set() # URLs (normalizadas) enfileiradas como source map
         self.lock = threading.Lock()
         self.scope_domains = set()
 
@@ -126,6 +306,29 @@ class BirdCraftScanner:
             return f'http://{url.strip()}'
         return url.strip()
 
+    def canonical_url(self, url):
+        """Forma única da URL para o conjunto de visitados: sem âncora, host minúsculo, sem porta padrão."""
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or '').lower()
+        if parsed.port and (scheme, parsed.port) not in (('http', 80), ('https', 443)):
+            host = f"{host}:{parsed.port}"
+        return urlunparse((scheme, host, parsed.path or '/', parsed.params, parsed.query, ''))
+
+    def enqueue(self, url, depth):
+        """Coloca a URL na fronteira se ainda não foi vista. Retorna True se enfileirou."""
+        url = self.canonical_url(url)
+        with self.lock:
+            if url in self.visited_urls:
+                return False
+            if len(self.visited_urls) >= self.max_urls:
+                self.crawl_stats["dropped"] += 1
+                return False
+            self.visited_urls.add(url)
+            self.crawl_stats["max_depth"] = max(self.crawl_stats["max_depth"], depth)
+        self.frontier.put((url, depth))
+        return True
+
     def load_targets(self):
         try:
             with open(self.input_file, 'r') as f:
@@ -152,12 +355,10 @@ class BirdCraftScanner:
         except:
             return False
 
-    def scan_url(self, url):
-        with self.lock:
-            if url in self.visited_urls:
-                return
-            self.visited_urls.add(url)
-
+    def scan_url(self, url, depth=0):
+        if url in self.source_maps or urlparse(url).path.lower().endswith('.map'):
+            self.scan_source_map(url)
+            return
         print(f"{Fore.YELLOW}[>] Analisando: {url}")
         
         try:
@@ -168,55 +369,179 @@ class BirdCraftScanner:
             if response.status_code == 200:
                 content = response.text
                 self.analyze_content(url, content)
-                self.extract_new_links(url, content)
+                # Só HTML tem links a seguir; JS/CSS podem apontar um source map
+                if 'html' in response.headers.get('Content-Type', 'text/html').lower():
+                    self.extract_new_links(url, content, depth)
+                else:
+                    self.discover_source_map(url, response.headers, content, depth)
             else:
                 print(f"{Fore.RED}[!] Erro {response.status_code} em {url}")
 
         except requests.exceptions.RequestException as e:
             print(f"{Fore.RED}[!] Falha de conexão em {url}: {str(e)}")
 
-    def extract_new_links(self, base_url, content):
+    def extract_new_links(self, base_url, content, depth=0):
         soup = BeautifulSoup(content, 'html.parser')
         new_links_found = 0
         
         for link in soup.find_all(['a', 'script', 'link']):
             href = link.get('href') or link.get('src')
             if href:
-                full_url = urljoin(base_url, href)
+                full_url = urljoin(base_url, href.strip())
                 # Limpa âncoras e parâmetros para validação
                 clean_url = full_url.split('#')[0] 
                 
-                if self.is_in_scope(clean_url) and clean_url not in self.visited_urls:
-                    # Adiciona dinamicamente para escaneamento (cuidado com recursão infinita em produção)
-                    # Aqui, para manter o script seguro, não adicionamos à fila principal de execução
-                    # em tempo real neste exemplo simples, mas poderíamos usar uma Queue.
-                    # Para este script, vamos focar na análise profunda das URLs fornecidas e links diretos 1 nível
-                    pass 
+                if not clean_url.startswith(('http://', 'https://')) or not self.is_in_scope(clean_url):
+                    continue
+                if urlparse(clean_url).path.lower().endswith(SKIP_EXTENSIONS):
+                    continue
+                # Scripts são sempre seguidos (é neles que estão os segredos); páginas
+                # só até a profundidade máxima para a recursão não varrer o site inteiro
+                is_script = link.name == 'script'
+                if not is_script and depth >= self.max_depth:
+                    continue
+                if self.enqueue(clean_url, depth + 1):
+                    new_links_found += 1
+                    with self.lock:
+                        self.crawl_stats["scripts" if is_script else "pages"] += 1
 
-    def analyze_content(self, url, content):
+        if new_links_found:
+            print(f"{Fore.BLUE}[*] {new_links_found} novo(s) link(s) em {base_url} (nível {depth})")
+
+    def discover_source_map(self, url, headers, content, depth=0):
+        """Enfileira o source map apontado pelo header SourceMap ou pelo comentário final."""
+        ref = headers.get('SourceMap') or headers.get('X-SourceMap')
+        if not ref:
+            # O comentário é a última linha do arquivo; rfind evita varrer o bundle com regex
+            pos = content.rfind('sourceMappingURL=')
+            if pos < 0:
+                return
+            match = SOURCE_MAP_COMMENT.search(content, max(0, content.rfind('\n', 0, pos) + 1))
+            if not match:
+                return
+            ref = match.group(1)
+
+        if ref.startswith('data:'):
+            self.scan_inline_source_map(url, ref)
+            return
+        map_url = urljoin(url, ref.strip()).split('#')[0]
+        if not map_url.startswith(('http://', 'https://')) or not self.is_in_scope(map_url):
+            return
+        with self.lock:
+            self.source_maps.add(self.canonical_url(map_url))
+        if self.enqueue(map_url, depth):
+            with self.lock:
+                self.crawl_stats["maps"] += 1
+
+    def scan_source_map(self, url):
+        """Baixa o .map em streaming e analisa cada arquivo original do sourcesContent."""
+        print(f"{Fore.YELLOW}[>] Analisando source map: {url}")
+        try:
+            time.sleep(random.uniform(0.5, 1.5))
+            with requests.get(url, headers=self.get_random_header(), timeout=10, verify=False,
+                              stream=True) as response:
+                if response.status_code != 200:
+                    print(f"{Fore.RED}[!] Erro {response.status_code} em {url}")
+                    return
+                decoder = codecs.getincrementaldecoder('utf-8')('replace')
+                chunks = (decoder.decode(chunk) for chunk in response.iter_content(SOURCE_MAP_CHUNK))
+                self.analyze_source_map(url, chunks)
+        except requests.exceptions.RequestException as e:
+            print(f"{Fore.RED}[!] Falha de conexão em {url}: {str(e)}")
+
+    def scan_inline_source_map(self, url, ref):
+        """Source map embutido no próprio arquivo como data: URI (builds de desenvolvimento)."""
+        header, _, payload = ref.partition(',')
+        try:
+            if header.endswith(';base64'):
+                text = base64.b64decode(payload).decode('utf-8', 'replace')
+            else:
+                text = unquote(payload)
+        except ValueError as e:
+            print(f"{Fore.RED}[!] Source map inline inválido em {url}: {e}")
+            return
+        with self.lock:
+            self.crawl_stats["maps"] += 1
+        self.analyze_source_map(f"{url} (inline)", [text])
+
+    def analyze_source_map(self, map_url, chunks):
+        """
+        Analisa cada arquivo original individualmente, atribuindo os achados ao
+        caminho original ("webpack:///src/api.js <- https://alvo/app.js.map").
+        """
+        reader = SourceMapReader(chunks)
+        # Só os matches ficam guardados: a lista "sources" pode vir depois do
+        # sourcesContent, então a atribuição aos caminhos é feita no fim
+        pending = []
+        count = 0
+        try:
+            for index, content in reader:
+                count += 1
+                found = self.match_content(content)
+                if found:
+                    pending.append((index, found))
+        except ValueError as e:
+            print(f"{Fore.RED}[!] Source map inválido em {map_url}: {e}")
+        for index, found in pending:
+            self.record_findings(f"{reader.source_name(index)} <- {map_url}", found)
+        with self.lock:
+            self.crawl_stats["sources"] += count
+        if count:
+            print(f"{Fore.BLUE}[*] {count} arquivo(s) original(is) analisado(s) em {map_url}")
+
+    def crawl_worker(self):
+        """Consome a fronteira até receber o sinal de parada (None)."""
+        while True:
+            item = self.frontier.get()
+            if item is None:
+                self.frontier.task_done()
+                return
+            url, depth = item
+            try:
+                self.scan_url(url, depth)
+            except Exception as e:
+                print(f"{Fore.RED}[!] Erro em {url}: {e}")
+            finally:
+                # Os filhos já foram enfileirados antes do task_done, então o join()
+                # só retorna quando a fronteira inteira foi consumida
+                self.frontier.task_done()
+
+    def match_content(self, content):
+        """Aplica os PATTERNS e devolve {tipo: matches únicos} sem registrar nada."""
+        found = {}
         for name, data in PATTERNS.items():
             matches = re.findall(data['regex'], content)
             if matches:
                 # Remove duplicatas encontradas na MESMA página
-                unique_matches = set(matches)
-                for match in unique_matches:
-                    # Chave única para evitar duplicata global no relatório
-                    finding_key = f"{name}:{match}"
-                    
-                    with self.lock:
-                        if finding_key not in self.findings:
-                            self.findings[finding_key] = {
-                                "type": name,
-                                "content": match,
-                                "desc": data['desc'],
-                                "exploit": data['exploit'],
-                                "urls": [url]
-                            }
-                        else:
-                            if url not in self.findings[finding_key]['urls']:
-                                self.findings[finding_key]['urls'].append(url)
-                                
-                        print(f"{Fore.GREEN}[+] ENCONTRADO: {name} em {url}")
+                found[name] = set(matches)
+        return found
+
+    def analyze_content(self, url, content):
+        self.record_findings(url, self.match_content(content))
+
+    def record_findings(self, url, found):
+        """Grava os achados no stream, uma linha JSON por (tipo, info, url)."""
+        lines = []
+        for name, unique_matches in found.items():
+            for match in unique_matches:
+                lines.append(json.dumps({"type": name, "content": match, "url": url}, ensure_ascii=False) + "\n")
+                print(f"{Fore.GREEN}[+] ENCONTRADO: {name} em {url}")
+        if lines:
+            with self.lock:
+                self.stream.write(''.join(lines))
+                self.stream.flush()
+                self.finding_count += len(lines)
+
+    def read_stream(self):
+        """Lê o stream de achados; uma linha cortada por uma queda é ignorada."""
+        with open(self.stream_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                if item.get("type") in PATTERNS:
+                    yield item
 
     def generate_report(self):
         print(f"\n{Fore.CYAN}[*] Gerando relatório em {self.output_file}...")
@@ -226,20 +551,30 @@ class BirdCraftScanner:
                 f.write(f"Data: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write("==================================================\n\n")
 
-                if not self.findings:
+                # Agrupa as URLs de cada achado (chave única "tipo:info"); só as
+                # chaves e URLs ficam em memória, descrições vêm dos PATTERNS
+                grouped = {}
+                for item in self.read_stream():
+                    urls = grouped.setdefault((item['type'], item['content']), [])
+                    if item['url'] not in urls:
+                        urls.append(item['url'])
+
+                if not grouped:
                     f.write("Nenhuma informação crítica encontrada com os padrões atuais.\n")
                 
-                for key, data in self.findings.items():
-                    f.write(f"[-] TIPO: {data['type']}\n")
-                    f.write(f"    INFO ENCONTRADA: {data['content']}\n")
+                for (name, content), urls in grouped.items():
+                    data = PATTERNS[name]
+                    f.write(f"[-] TIPO: {name}\n")
+                    f.write(f"    INFO ENCONTRADA: {content}\n")
                     f.write(f"    DESCRIÇÃO: {data['desc']}\n")
                     f.write(f"    DICA DE EXPLORAÇÃO: {data['exploit']}\n")
                     f.write(f"    ENCONTRADO NAS URLS:\n")
-                    for u in data['urls']:
+                    for u in urls:
                         f.write(f"      -> {u}\n")
                     f.write("-" * 60 + "\n")
             
-            print(f"{Fore.GREEN}[OK] Relatório salvo com sucesso!")
+            print(f"{Fore.GREEN}[OK] Relatório salvo com sucesso! "
+                  f"({self.finding_count} achado(s) por URL, stream em {self.stream_file})")
             
         except Exception as e:
             print(f"{Fore.RED}[!] Erro ao salvar relatório: {e}")
@@ -250,24 +585,47 @@ class BirdCraftScanner:
         # Threading pool para performance
         print(f"{Fore.BLUE}[*] Iniciando scanner com {self.threads} threads...")
         
-        # Fase 1: Scan das URLs iniciais
+        # Crawl BFS: os alvos iniciais entram no nível 0 e cada worker enfileira
+        # os links em escopo que encontra na mesma fronteira compartilhada
+        self.stream = open(self.stream_file, 'w', encoding='utf-8')
+        print(f"{Fore.BLUE}[*] Achados em tempo real: {self.stream_file}")
+        for url in self.urls_to_scan:
+            self.enqueue(url, 0)
         with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            futures = [executor.submit(self.scan_url, url) for url in self.urls_to_scan]
+            futures = [executor.submit(self.crawl_worker) for _ in range(self.threads)]
+            self.frontier.join()
+            for _ in futures:
+                self.frontier.put(None)
             for future in as_completed(futures):
                 pass # Aguarda conclusão
         
-        # Fase 2 (Opcional): Implementar lógica recursiva de N níveis aqui se necessário
+        stats = self.crawl_stats
+        print(f"{Fore.BLUE}[*] Crawl concluído: {len(self.visited_urls)} URL(s) visitada(s) | "
+              f"{stats['pages']} página(s) e {stats['scripts']} script(s) descobertos | "
+              f"nível máx.: {stats['max_depth']}"
+              + (f" | {stats['maps']} source map(s) com {stats['sources']} arquivo(s) original(is)"
+                 if stats['maps'] else "")
+              + (f" | {stats['dropped']} ignorada(s) pelo limite de {self.max_urls}" if stats['dropped'] else ""))
         
+        self.stream.close()
         self.generate_report()
 
 # --- ENTRY POINT ---
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Bird-CraftJS: Static Analysis Tool for Pentesters")
     parser.add_argument("file", help="Arquivo .txt contendo as URLs")
+    parser.add_argument("-t", "--threads", type=int, default=7, help="Workers do crawl (padrão: 7)")
+    parser.add_argument("-d", "--depth", type=int, default=MAX_DEPTH,
+                        help=f"Profundidade máxima de páginas a partir de cada alvo (padrão: {MAX_DEPTH})")
+    parser.add_argument("--max-urls", type=int, default=MAX_URLS,
+                        help=f"Máximo de URLs visitadas por execução (padrão: {MAX_URLS})")
+    parser.add_argument("--stream", help="JSONL com os achados gravados durante o scan "
+                                         "(padrão: output-craftjs.jsonl)")
     args = parser.parse_args()
 
     # Supressão de warnings de SSL inseguro (comum em pentest)
     requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
 
-    scanner = BirdCraftScanner(input_file=args.file)
+    scanner = BirdCraftScanner(input_file=args.file, threads=args.threads, max_depth=args.depth,
+                               max_urls=args.max_urls, stream_file=args.stream)
     scanner.run()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bird Domains - Canonicalização de domínios compartilhada pelas ferramentas
+
+Reduz as muitas formas em que um mesmo site aparece nos leaks a um único
+domínio registrável:
+
+    https://www.empresa.com.br:443/login   -> empresa.com.br
+    empresa.com.br:8080/admin              -> empresa.com.br
+    joao@mail.empresa.com.br               -> empresa.com.br
+    android://Abc123==@br.com.empresa.app/ -> empresa.com.br
+
+Usado pelo bird-leak-searcher-v3.py (chaves de domínio do índice) e pelo
+bird-leak-cleaner-v2.py (coluna de domínio do CSV). Os outros scripts
+carregam este arquivo com importlib, como fazem com os demais scripts
+irmãos de nome com hífens.
+
+Uso:
+    bird-domains.py https://www.empresa.com.br:443/login
+    bird-domains.py -f urls.txt
+
+Autor: Bird Domains
+"""
+
+import argparse
+import ipaddress
+import re
+import sys
+from typing import Optional
+
+
+# Sufixos públicos de mais de um rótulo: o domínio registrável tem um
+# rótulo a mais que o sufixo (empresa.com.br, empresa.co.uk)
+PUBLIC_SUFFIXES = {
+    # Brasil (registro.br)
+    'com.br', 'net.br', 'org.br', 'gov.br', 'edu.br', 'mil.br', 'art.br', 'blog.br',
+    'eco.br', 'emp.br', 'ind.br', 'inf.br', 'jus.br', 'leg.br', 'mp.br', 'nom.br',
+    'srv.br', 'tv.br', 'app.br', 'dev.br', 'log.br', 'tec.br', 'adv.br', 'eng.br',
+    'med.br', 'psi.br', 'rec.br', 'tur.br', 'coop.br', 'fm.br', 'def.br',
+    # Outros países frequentes nos leaks
+    'co.uk', 'org.uk', 'gov.uk', 'ac.uk', 'me.uk', 'net.uk',
+    'com.au', 'net.au', 'org.au', 'gov.au', 'edu.au',
+    'com.ar', 'gob.ar', 'gov.ar', 'com.mx', 'gob.mx', 'com.pt', 'gov.pt',
+    'co.jp', 'ne.jp', 'or.jp', 'co.in', 'gov.in', 'co.za', 'gov.za',
+    'com.co', 'gov.co', 'com.pe', 'gob.pe', 'com.uy', 'com.py', 'com.ve', 'com.ec',
+    'com.bo', 'cl.cl', 'com.tr', 'com.cn', 'com.tw', 'com.hk', 'com.sg', 'co.id',
+    'co.kr', 'co.nz', 'co.il', 'com.ng', 'com.eg', 'com.sa', 'com.my', 'com.ph',
+}
+
+ANDROID_PATTERN = re.compile(r'^android://(?:[^@/\s]*@)?([a-z0-9_.\-]+)', re.IGNORECASE)
+SCHEME_PATTERN = re.compile(r'^[a-z][a-z0-9+.\-]*://', re.IGNORECASE)
+HOST_PATTERN = re.compile(r'^(?:[a-z0-9_\-]+\.)+[a-z]{2,}$')
+# Prefixos de serviço que não fazem parte do nome do site
+SERVICE_PREFIXES = ('www.', 'www1.', 'www2.', 'm.')
+
+
+def registrable_domain(host: str) -> str:
+    """Reduz um host ao domínio registrável (ex: a.b.empresa.com.br -> empresa.com.br)."""
+    host = host.lower().strip('.')
+    labels = host.split('.')
+    if len(labels) >= 3 and '.'.join(labels[-2:]) in PUBLIC_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def android_package_host(package: str) -> str:
+    """Inverte o nome de pacote Android em host (br.com.empresa.app -> app.empresa.com.br)."""
+    return '.'.join(reversed(package.lower().strip('.').split('.')))
+
+
+def canonical_host(text: str) -> Optional[str]:
+    """
+    Extrai o host de uma URL, email, host:porta ou URI android://, em
+    minúsculas, sem porta, credenciais, caminho e prefixo www. Retorna None
+    se não houver host reconhecível.
+    """
+    text = text.strip()
+    if not text:
+        return None
+
+    android = ANDROID_PATTERN.match(text)
+    if android:
+        host = android_package_host(android.group(1))
+        return host if HOST_PATTERN.match(host) else None
+
+    text = SCHEME_PATTERN.sub('', text)
+    # Autoridade termina no primeiro /, ?, # ou espaço
+    authority = re.split(r'[/?#\s]', text, maxsplit=1)[0]
+    # Credenciais (user:pass@host) ou email (login@host)
+    host = authority.rsplit('@', 1)[-1]
+    if host.startswith('['):
+        host = host[1:host.find(']')] if ']' in host else host[1:]
+    elif host.count(':') == 1:
+        host = host.split(':', 1)[0]
+    host = host.lower().strip('.')
+
+    try:
+        return str(ipaddress.ip_address(host))
+    except ValueError:
+        pass
+    if not HOST_PATTERN.match(host):
+        return None
+    for prefix in SERVICE_PREFIXES:
+        rest = host[len(prefix):]
+        if host.startswith(prefix) and '.' in rest and rest not in PUBLIC_SUFFIXES:
+            host = rest
+            break
+    return host
+
+
+def canonical_domain(text: str) -> Optional[str]:
+    """
+    Domínio registrável canônico de uma URL, email, host ou URI android://
+    (IPs são devolvidos como estão). Retorna None se não houver domínio.
+    """
+    host = canonical_host(text)
+    if host is None:
+        return None
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        return registrable_domain(host)
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(
+        description='Bird Domains - Canonicaliza URLs, emails e hosts no domínio registrável',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+  %(prog)s https://www.empresa.com.br:443/login
+  %(prog)s "android://Abc123==@br.com.empresa.app/"
+  %(prog)s -f urls.txt
+        """
+    )
+    parser.add_argument('values', nargs='*', help='URLs, emails ou hosts')
+    parser.add_argument('-f', '--file', help='Arquivo com um valor por linha')
+    args = parser.parse_args()
+
+    values = list(args.values)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8', errors='ignore') as f:
+            values.extend(line.rstrip('\n') for line in f)
+    if not values:
+        parser.print_help()
+        sys.exit(1)
+
+    for value in values:
+        print(f"{value}\t{canonical_domain(value) or ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Bird Leak Cleaner AI - Benchmark do pipeline contra o mock do Ollama
+
+Executa o process_file do bird-leak-cleaner-ai-qwen7b.py contra o servidor
+bird-ollama-mock.py (sem GPU) e mede:
+  - overhead do pipeline (mock instantâneo -> custo puro do cliente por linha)
+  - escalonamento com o número de workers (mock com latência e token rate)
+  - taxa de fallback com uma fração de respostas JSON inválidas
+  - escalonamento com o número de endpoints (vários mocks com 1 slot cada)
+  - tokens por linha do prompt padrão vs. compacto (com e sem context)
+
+Uso:
+    bird-leak-cleaner-ai-bench.py
+    bird-leak-cleaner-ai-bench.py --lines 2000 --workers 1,2,4,8 --latency 0.3
+    bird-leak-cleaner-ai-bench.py --endpoints 1,2,4
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def load_script(filename: str):
+    """Importa um script irmão (nome com hífens) como módulo."""
+    path = SCRIPT_DIR / filename
+    name = path.stem.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+cleaner = load_script("bird-leak-cleaner-ai-qwen7b.py")
+mock = load_script("bird-ollama-mock.py")
+
+
+def generate_input(path: str, total: int, seed: int = 42):
+    """Gera um arquivo sintético com formatos de linha variados."""
+    rng = random.Random(seed)
+    domains = ["example.com.br", "portal.gov.br", "loja.com", "intranet.net", "app.io"]
+    formats = [
+        "https://{d}/login:{u}@{d}:{p}",
+        "{d}:{u}:{p}",
+        "{u}@{d}|{p}",
+        "{u}@{d}:{p}",
+        "{u}:{p} https://{d}/",
+        "http://{d}:8080/admin;{u};{p}",
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(total):
+            d = rng.choice(domains)
+            u = f"user{i}"
+            p = "".join(rng.choice("abcXYZ123!@#:") for _ in range(rng.randint(6, 14)))
+            f.write(rng.choice(formats).format(d=d, u=u, p=p) + "\n")
+
+
+def run_once(input_file: str, workdir: str, urls: list[str], batch_size: int, workers: int, **options) -> dict:
+    """Executa process_file uma vez e devolve as métricas da execução."""
+    for key in cleaner.STATS:
+        cleaner.STATS[key] = 0
+
+    output_file = os.path.join(workdir, f"out-{workers}-{time.monotonic_ns()}.csv")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaner.process_file(input_file, output_file, batch_size, workers=workers, delay=0, endpoints=urls,
+                             **options)
+    elapsed = time.perf_counter() - start
+
+    stats = dict(cleaner.STATS)
+    lines = stats["ai_lines"] + stats["fallback_lines"]
+    return {
+        "endpoints": len(urls),
+        "workers": workers,
+        "seconds": elapsed,
+        "lines": lines,
+        "lines_per_s": lines / elapsed if elapsed else 0.0,
+        "ms_per_line": elapsed * 1000 / lines if lines else 0.0,
+        "requests": stats["requests"],
+        "fallback_rate": stats["fallback_lines"] / lines if lines else 0.0,
+        "tokens_per_line": (stats["prompt_tokens"] + stats["eval_tokens"]) / lines if lines else 0.0,
+    }
+
+
+def print_table(title: str, rows: list[dict], baseline: float = None):
+    """Imprime os resultados de um cenário."""
+    print(f"\n{title}")
+    print("-" * 94)
+    print(f"{'endpts':>6} {'workers':>8} {'tempo(s)':>10} {'linhas/s':>10} {'ms/linha':>10} {'reqs':>7} {'fallback':>9} {'tok/lin':>8} {'speedup':>8}")
+    for r in rows:
+        speedup = r["lines_per_s"] / baseline if baseline else 1.0
+        print(f"{r['endpoints']:>6} {r['workers']:>8} {r['seconds']:>10.2f} {r['lines_per_s']:>10.1f} {r['ms_per_line']:>10.3f} "
+              f"{r['requests']:>7} {r['fallback_rate']:>8.1%} {r['tokens_per_line']:>8.1f} {speedup:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark do pipeline do Bird Leak Cleaner AI usando o mock do Ollama",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--lines', type=int, default=500, help='Linhas sintéticas por execução (padrão: 500)')
+    parser.add_argument('--batch-size', type=int, default=cleaner.BATCH_SIZE,
+                        help=f'Linhas por batch (padrão: {cleaner.BATCH_SIZE})')
+    parser.add_argument('--workers', default="1,2,4,8", help='Lista de workers a testar (padrão: 1,2,4,8)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Latência do mock em segundos (padrão: 0.2)')
+    parser.add_argument('--token-rate', type=float, default=200.0, help='Tokens/s do mock (padrão: 200)')
+    parser.add_argument('--parallel', type=int, default=mock.DEFAULT_PARALLEL,
+                        help=f'Slots de geração do mock (padrão: {mock.DEFAULT_PARALLEL})')
+    parser.add_argument('--malformed-rate', type=float, default=0.1,
+                        help='Fração de JSON inválido no cenário de fallback (padrão: 0.1)')
+    parser.add_argument('--endpoints', default="1,2,4",
+                        help='Quantidades de endpoints (mocks com 1 slot) a testar (padrão: 1,2,4)')
+    args = parser.parse_args()
+
+    workers_list = [int(w) for w in args.workers.split(',') if w.strip()]
+    endpoints_list = [int(n) for n in args.endpoints.split(',') if n.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="bird-bench-") as workdir:
+        input_file = os.path.join(workdir, "input.txt")
+        generate_input(input_file, args.lines)
+
+        print("=" * 94)
+        print("📊 BENCHMARK - BIRD LEAK CLEANER AI (mock Ollama)")
+        print("=" * 94)
+        print(f"  Linhas: {args.lines} | Batch: {args.batch_size} | Slots do mock: {args.parallel}")
+
+        # 1. Overhead do pipeline: mock sem latência nem custo por token
+        server = mock.start_in_thread(port=0, latency=0, token_rate=0, prompt_rate=0, parallel=args.parallel)
+        urls = [f"127.0.0.1:{server.server_address[1]}"]
+        rows = [run_once(input_file, workdir, urls, args.batch_size, 1)]
+        server.shutdown()
+        print_table("1) Overhead do pipeline (mock instantâneo)", rows)
+
+        # 2. Escalonamento com workers
+        server = mock.start_in_thread(port=0, latency=args.latency, token_rate=args.token_rate,
+                                      parallel=args.parallel)
+        urls = [f"127.0.0.1:{server.server_address[1]}"]
+        rows = [run_once(input_file, workdir, urls, args.batch_size, w) for w in workers_list]
+        server.shutdown()
+        print_table(f"2) Escalonamento (latência {args.latency}s, {args.token_rate} tokens/s)",
+                    rows, rows[0]["lines_per_s"])
+
+        # 3. Taxa de fallback com respostas inválidas
+        server = mock.start_in_thread(port=0, latency=0, token_rate=0, prompt_rate=0,
+                                      malformed_rate=args.malformed_rate, parallel=args.parallel, seed=1)
+        urls = [f"127.0.0.1:{server.server_address[1]}"]
+        rows = [run_once(input_file, workdir, urls, args.batch_size, max(workers_list))]
+        server.shutdown()
+        print_table(f"3) Fallback ({args.malformed_rate:.0%} de JSON inválido)", rows)
+
+        # 4. Escalonamento com endpoints: cada mock gera uma resposta por vez
+        rows = []
+        for count in endpoints_list:
+            servers = [mock.start_in_thread(port=0, latency=args.latency, token_rate=args.token_rate, parallel=1)
+                       for _ in range(count)]
+            urls = [f"127.0.0.1:{srv.server_address[1]}" for srv in servers]
+            rows.append(run_once(input_file, workdir, urls, args.batch_size, count * 2))
+            for srv in servers:
+                srv.shutdown()
+        print_table("4) Escalonamento por endpoints (1 slot por mock, 2 workers por endpoint)",
+                    rows, rows[0]["lines_per_s"])
+
+        # 5. Prompt padrão vs. compacto
+        server = mock.start_in_thread(port=0, latency=args.latency, token_rate=args.token_rate,
+                                      parallel=args.parallel)
+        urls = [f"127.0.0.1:{server.server_address[1]}"]
+        workers = max(workers_list)
+        rows = [
+            run_once(input_file, workdir, urls, args.batch_size, workers),
+            run_once(input_file, workdir, urls, cleaner.COMPACT_BATCH_SIZE, workers, compact=True),
+            run_once(input_file, workdir, urls, cleaner.COMPACT_BATCH_SIZE, workers, compact=True,
+                     reuse_context=True),
+        ]
+        server.shutdown()
+        print_table(f"5) Prompt: padrão (batch {args.batch_size}) | compacto (batch {cleaner.COMPACT_BATCH_SIZE}) | "
+                    "compacto + context", rows, rows[0]["lines_per_s"])
+        print("=" * 94)
+
+
+if __name__ == "__main__":
+    main()
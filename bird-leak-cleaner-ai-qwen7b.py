@@ -7,6 +7,7 @@ usando IA para identificar e separar os campos corretamente.
 
 Uso:
     bird-leak-cleaner.py -f <arquivo_entrada> -o <arquivo_saida.csv>
+    bird-leak-cleaner.py -f <arquivo_entrada> -o <arquivo_saida.csv> --resume
 """
 
 import argparse
@@ -15,7 +16,10 @@ import json
 import os
 import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -28,9 +32,126 @@ except ImportError:
 
 # Configurações
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
+OLLAMA_API_URLS_ENV = "OLLAMA_API_URLS"
 MODEL_NAME = "qwen2.5:7b"
 BATCH_SIZE = 5
+COMPACT_BATCH_SIZE = 25
+WORKERS = 1
+BATCH_DELAY = 0.3
 REQUEST_TIMEOUT = 600
+CHECKPOINT_SUFFIX = ".progress"
+CSV_FIELDS = ['url', 'login', 'password']
+MIN_CONFIDENCE = 0.6
+MAX_ENDPOINT_FAILURES = 3
+ENDPOINT_COOLDOWN = 30
+
+# Contadores globais (compartilhados entre as threads de processamento)
+STATS = {
+    "requests": 0, "failed_requests": 0, "ai_lines": 0, "fallback_lines": 0,
+    "prompt_tokens": 0, "eval_tokens": 0,
+    "requeried_lines": 0, "low_confidence_lines": 0, "confidence_sum": 0.0,
+}
+STATS_LOCK = threading.Lock()
+
+
+def count_stat(key: str, value: float = 1):
+    """Incrementa um contador global de forma thread-safe."""
+    with STATS_LOCK:
+        STATS[key] += value
+
+
+class OllamaUnavailable(RuntimeError):
+    """Nenhum endpoint do Ollama respondeu (todos fora de rotação)."""
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """Aceita host:porta, URL base ou URL completa e retorna a URL de /api/generate."""
+    endpoint = endpoint.strip().rstrip('/')
+    if not re.match(r'^https?://', endpoint, re.I):
+        endpoint = "http://" + endpoint
+    if not endpoint.endswith("/api/generate"):
+        endpoint += "/api/generate"
+    return endpoint
+
+
+class Endpoint:
+    """Estado e estatísticas de um servidor Ollama."""
+    
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.lines = 0
+        self.busy_seconds = 0.0
+        self.context = None
+        self.prime_lock = threading.Lock()
+
+
+class EndpointPool:
+    """
+    Distribui requisições entre vários servidores Ollama.
+    Escolhe sempre o endpoint saudável com menos requisições em andamento
+    (least-outstanding-requests) e tira de rotação, por ENDPOINT_COOLDOWN
+    segundos, o endpoint que acumular MAX_ENDPOINT_FAILURES falhas seguidas.
+    """
+    
+    def __init__(self, urls: list[str]):
+        self.endpoints = [Endpoint(normalize_endpoint(u)) for u in urls]
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> Optional[Endpoint]:
+        """Reserva um endpoint; retorna None se todos estiverem fora de rotação."""
+        with self.lock:
+            now = time.monotonic()
+            healthy = [e for e in self.endpoints if e.down_until <= now]
+            if not healthy:
+                return None
+            endpoint = min(healthy, key=lambda e: (e.outstanding, e.requests))
+            endpoint.outstanding += 1
+            return endpoint
+    
+    def reserve(self, endpoint: Endpoint):
+        """Conta mais uma requisição em andamento num endpoint já escolhido."""
+        with self.lock:
+            endpoint.outstanding += 1
+    
+    def release(self, endpoint: Endpoint, ok: bool, lines: int = 0, elapsed: float = 0.0):
+        """Libera o endpoint registrando o resultado da requisição."""
+        with self.lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            endpoint.busy_seconds += elapsed
+            if ok:
+                endpoint.failures = 0
+                endpoint.lines += lines
+            else:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                now = time.monotonic()
+                if endpoint.failures >= MAX_ENDPOINT_FAILURES and endpoint.down_until <= now:
+                    endpoint.down_until = now + ENDPOINT_COOLDOWN
+                    print(f"\nAviso: {endpoint.url} fora de rotação por {ENDPOINT_COOLDOWN}s "
+                          f"({endpoint.failures} falhas seguidas)")
+    
+    def all_down(self) -> bool:
+        """True se nenhum endpoint estiver em rotação."""
+        with self.lock:
+            now = time.monotonic()
+            return all(e.down_until > now for e in self.endpoints)
+    
+    def report(self, elapsed: float):
+        """Imprime a vazão de cada endpoint."""
+        print("  🌐 Endpoints:")
+        now = time.monotonic()
+        for e in self.endpoints:
+            status = "ativo" if e.down_until <= now else "fora de rotação"
+            rate = e.lines / elapsed if elapsed else 0.0
+            avg = e.busy_seconds / e.requests if e.requests else 0.0
+            print(f"     {e.url} | {status} | reqs: {e.requests} | erros: {e.errors} | "
+                  f"linhas: {e.lines} ({rate:.1f}/s) | latência média: {avg:.2f}s")
 
 
 def create_prompt(lines: list[str]) -> str:
@@ -60,41 +181,143 @@ Responda APENAS com JSON válido:
     return prompt
 
 
-def query_ollama(prompt: str) -> Optional[str]:
-    """Envia prompt ao Ollama e retorna a resposta."""
+# Cabeçalho mínimo do modo compacto (resposta em TSV em vez de JSON)
+COMPACT_HEADER = """Separe URL, login e senha de cada linha numerada. Os separadores : | ; e espaço podem fazer parte da senha. Campo ausente fica vazio.
+Responda só TSV, uma linha por entrada: n<TAB>url<TAB>login<TAB>senha
+"""
+
+
+def create_compact_prompt(lines: list[str]) -> str:
+    """Cria o corpo do prompt compacto (sem o cabeçalho de instruções)."""
+    lines_text = "\n".join(f"{i+1}. {line}" for i, line in enumerate(lines))
+    return f"{lines_text}\nTSV:\n"
+
+
+def build_payload(prompt: str, keep_alive: Optional[str] = None, num_predict: int = 2048) -> dict:
+    """Monta o payload de /api/generate."""
     payload = {
         "model": MODEL_NAME,
         "prompt": prompt,
         "stream": False,
         "options": {
             "temperature": 0.1,
-            "num_predict": 2048,
+            "num_predict": num_predict,
             "num_gpu": 999,
             "num_ctx": 4096,
             "num_batch": 1024,
             "main_gpu": 0,
         }
     }
-    
-    try:
-        response = requests.post(
-            OLLAMA_API_URL,
-            json=payload,
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
-        result = response.json()
-        return result.get("response", "")
-    except requests.exceptions.ConnectionError:
-        print("\nErro: Não foi possível conectar ao Ollama. Verifique se está rodando.")
-        print("Execute: ollama serve")
-        sys.exit(1)
-    except requests.exceptions.Timeout:
-        print(f"\nAviso: Timeout na requisição (>{REQUEST_TIMEOUT}s)")
-        return None
-    except Exception as e:
-        print(f"\nErro na requisição: {e}")
-        return None
+    if keep_alive:
+        payload["keep_alive"] = keep_alive
+    return payload
+
+
+def count_tokens(result: dict):
+    """Acumula os tokens de prompt e de resposta informados pelo Ollama."""
+    count_stat("prompt_tokens", int(result.get("prompt_eval_count") or 0))
+    count_stat("eval_tokens", int(result.get("eval_count") or 0))
+
+
+def prime_context(
+    pool: EndpointPool,
+    endpoint: Endpoint,
+    header: str,
+    keep_alive: Optional[str] = None,
+) -> Optional[list]:
+    """
+    Avalia o cabeçalho uma única vez no endpoint e guarda o "context" devolvido,
+    para que os próximos prompts enviem apenas as linhas.
+    Só uma thread por endpoint faz a avaliação; as demais esperam e reutilizam
+    o context. A requisição entra na contabilidade do pool como qualquer outra.
+    O token gerado na avaliação é cortado do context guardado.
+    """
+    with endpoint.prime_lock:
+        if endpoint.context:
+            return endpoint.context
+        
+        # Só o cabeçalho, sem instrução extra: o context vira o prefixo de todo prompt
+        payload = build_payload(header, keep_alive, num_predict=1)
+        pool.reserve(endpoint)
+        count_stat("requests")
+        start = time.monotonic()
+        try:
+            response = requests.post(endpoint.url, json=payload, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            result = response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            pool.release(endpoint, False, elapsed=time.monotonic() - start)
+            count_stat("failed_requests")
+            return None
+        pool.release(endpoint, True, elapsed=time.monotonic() - start)
+        count_tokens(result)
+        # O context termina com o token gerado (num_predict=0 não evita: no Ollama
+        # significa "sem limite"); corta os eval_count finais e fica só o cabeçalho
+        context = result.get("context") or []
+        generated = int(result.get("eval_count") or 0)
+        if generated:
+            context = context[:-generated]
+        endpoint.context = context or None
+        return endpoint.context
+
+
+def query_ollama(
+    prompt: str,
+    pool: EndpointPool,
+    lines: int = 0,
+    header: str = "",
+    reuse_context: bool = False,
+    keep_alive: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Envia prompt ao Ollama (endpoint escolhido pelo pool) e retorna a resposta.
+    Com reuse_context o cabeçalho é avaliado uma vez por endpoint e reaproveitado
+    via "context"; caso contrário é enviado junto com cada prompt.
+    """
+    # Falhas de conexão são repetidas em outro endpoint até todos saírem de rotação
+    for _ in range(len(pool.endpoints) * MAX_ENDPOINT_FAILURES):
+        endpoint = pool.acquire()
+        if endpoint is None:
+            break
+        start = time.monotonic()
+        try:
+            context = None
+            if header and reuse_context:
+                context = endpoint.context or prime_context(pool, endpoint, header, keep_alive)
+            if context:
+                payload = build_payload(prompt, keep_alive)
+                payload["context"] = context
+            else:
+                payload = build_payload(header + prompt, keep_alive)
+            
+            response = requests.post(
+                endpoint.url,
+                json=payload,
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            result = response.json()
+            count_tokens(result)
+            pool.release(endpoint, True, lines, time.monotonic() - start)
+            return result.get("response", "")
+        except requests.exceptions.ConnectionError:
+            pool.release(endpoint, False, elapsed=time.monotonic() - start)
+            if pool.all_down():
+                break
+        except requests.exceptions.Timeout:
+            pool.release(endpoint, False, elapsed=time.monotonic() - start)
+            print(f"\nAviso: Timeout na requisição em {endpoint.url} (>{REQUEST_TIMEOUT}s)")
+            return None
+        except Exception as e:
+            pool.release(endpoint, False, elapsed=time.monotonic() - start)
+            print(f"\nErro na requisição em {endpoint.url}: {e}")
+            return None
+    
+    # Sobe até a thread principal, que interrompe o processamento (sys.exit aqui
+    # encerraria só esta thread do executor)
+    raise OllamaUnavailable(
+        f"Não foi possível conectar ao Ollama ({', '.join(e.url for e in pool.endpoints)})"
+    )
 
 
 def extract_json_from_response(response: str) -> Optional[list]:
@@ -120,6 +343,31 @@ def extract_json_from_response(response: str) -> Optional[list]:
         return None
 
 
+def extract_tsv_from_response(response: str) -> Optional[list]:
+    """Extrai as linhas "n<TAB>url<TAB>login<TAB>senha" da resposta compacta."""
+    if not response:
+        return None
+    
+    response = re.sub(r'<think>.*?</think>', '', response, flags=re.DOTALL)
+    
+    items = []
+    for raw in response.splitlines():
+        parts = raw.rstrip('\r').split('\t')
+        if len(parts) < 4:
+            continue
+        num = parts[0].strip().rstrip('.')
+        if not num.isdigit():
+            continue
+        items.append({
+            "line": int(num),
+            "url": parts[1],
+            "login": parts[2],
+            # Tabs extras só podem ter vindo da própria senha
+            "password": "\t".join(parts[3:]),
+        })
+    return items or None
+
+
 def validate_result(result: dict) -> bool:
     """Valida se o resultado tem campos mínimos necessários."""
     has_login = bool(result.get("login", "").strip())
@@ -196,100 +444,378 @@ def fallback_parse(line: str) -> dict:
     return {"url": url_found, "login": login_found, "password": password_found}
 
 
-def process_batch(lines: list[str], line_offset: int) -> list[dict]:
+# Padrões de plausibilidade usados na pontuação de confiança
+URL_FIELD_PATTERN = re.compile(
+    r'^(?:[a-z][a-z0-9+.-]*://\S+|(?:[a-z0-9-]+\.)+[a-z]{2,}(?::\d+)?(?:/\S*)?)$', re.I
+)
+LOGIN_FIELD_PATTERN = re.compile(
+    r'^(?:[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}'     # email
+    r'|\d{3}\.?\d{3}\.?\d{3}-?\d{2}'                # CPF
+    r'|\+?[\d\s()-]{8,20}'                          # telefone
+    r'|[^\s:|;]{2,100})$',                           # username
+    re.I
+)
+
+
+def clean_result(result: dict) -> dict:
+    """Normaliza um resultado da IA para url/login/password em texto."""
+    return {field: str(result.get(field) or "").strip() for field in CSV_FIELDS}
+
+
+def round_trip_score(line: str, result: dict) -> float:
     """
-    Processa um batch de linhas - MODO FORÇADO (sem out-of-pattern).
-    Retorna: lista de resultados (sempre retorna algo para cada linha)
+    Verifica se a linha original pode ser reconstruída a partir dos campos:
+    cada campo precisa existir na linha e o que sobra deve ser só separador.
     """
-    results = []
-    
-    prompt = create_prompt(lines)
-    response = query_ollama(prompt)
+    rest = line
+    for field in CSV_FIELDS:
+        value = result.get(field, "")
+        if not value:
+            continue
+        pos = rest.find(value)
+        if pos < 0:
+            # Campo inventado ou alterado pelo modelo
+            return 0.0
+        rest = rest[:pos] + "\x00" + rest[pos + len(value):]
+    leftover = re.sub(r'[\s:|;\x00]', '', rest)
+    if not leftover:
+        return 1.0
+    return max(0.0, 1.0 - len(leftover) / max(1, len(line)))
+
+
+def plausibility_score(result: dict) -> float:
+    """Fração dos campos preenchidos que têm formato plausível."""
+    checks = []
+    if result["url"]:
+        checks.append(bool(URL_FIELD_PATTERN.match(result["url"])))
+    if result["login"]:
+        checks.append(bool(LOGIN_FIELD_PATTERN.match(result["login"])) and '://' not in result["login"])
+    if result["password"]:
+        checks.append(len(result["password"]) <= 128 and not URL_FIELD_PATTERN.match(result["password"]))
+    return sum(checks) / len(checks) if checks else 0.0
+
+
+def agreement_score(result: dict, reference: dict) -> float:
+    """Fração dos campos iguais aos do fallback_parse."""
+    same = (
+        result["url"].lower() == reference["url"].lower(),
+        result["login"].lower() == reference["login"].lower(),
+        result["password"] == reference["password"],
+    )
+    return sum(same) / len(same)
+
+
+def confidence_score(line: str, result: dict, reference: dict) -> float:
+    """
+    Confiança (0 a 1) de um resultado da IA: 40% reconstrução da linha,
+    30% plausibilidade dos campos e 30% concordância com o fallback_parse.
+    """
+    return (
+        0.4 * round_trip_score(line, result)
+        + 0.3 * plausibility_score(result)
+        + 0.3 * agreement_score(result, reference)
+    )
+
+
+def query_batch(
+    lines: list[str],
+    pool: EndpointPool,
+    compact: bool = False,
+    reuse_context: bool = False,
+    keep_alive: Optional[str] = None,
+) -> dict:
+    """Consulta a IA para um batch e retorna {número_da_linha: resultado válido}."""
+    if compact:
+        response = query_ollama(create_compact_prompt(lines), pool, len(lines), header=COMPACT_HEADER,
+                                reuse_context=reuse_context, keep_alive=keep_alive)
+    else:
+        response = query_ollama(create_prompt(lines), pool, len(lines), keep_alive=keep_alive)
+    count_stat("requests")
+    if response is None:
+        count_stat("failed_requests")
     
     # Tenta processar resposta da IA
     parsed = None
     if response:
-        parsed = extract_json_from_response(response)
+        if compact:
+            parsed = extract_tsv_from_response(response)
+        else:
+            parsed = extract_json_from_response(response)
     
     # Mapeia resultados por número da linha
     results_map = {}
     if parsed:
         for item in parsed:
-            if isinstance(item, dict) and "line" in item:
-                results_map[item["line"]] = item
+            if not isinstance(item, dict) or "line" not in item:
+                continue
+            cleaned = clean_result(item)
+            if validate_result(cleaned):
+                results_map[item["line"]] = cleaned
+    return results_map
+
+
+def process_batch(
+    lines: list[str],
+    line_offset: int,
+    pool: EndpointPool,
+    compact: bool = False,
+    reuse_context: bool = False,
+    keep_alive: Optional[str] = None,
+    min_confidence: float = MIN_CONFIDENCE,
+    requery: bool = True,
+) -> list[dict]:
+    """
+    Processa um batch de linhas - MODO FORÇADO (sem out-of-pattern).
+    Cada resultado da IA recebe uma confiança; linhas que discordam do
+    fallback_parse e ficam abaixo de min_confidence são reenviadas uma vez,
+    em um batch só com elas.
+    Retorna: lista de resultados (sempre retorna algo para cada linha)
+    """
+    results_map = query_batch(lines, pool, compact, reuse_context, keep_alive)
+    fallbacks = [fallback_parse(line) for line in lines]
+    
+    chosen = {}
+    doubtful = []
+    for i, line in enumerate(lines):
+        result = results_map.get(i + 1)
+        if not result:
+            continue
+        confidence = confidence_score(line, result, fallbacks[i])
+        if confidence >= min_confidence or agreement_score(result, fallbacks[i]) == 1.0:
+            chosen[i] = (result, confidence)
+        else:
+            doubtful.append((i, result, confidence))
+    
+    # Reconsulta apenas as linhas em que a IA discorda do fallback com baixa confiança
+    retry_map = {}
+    if doubtful and requery:
+        count_stat("requeried_lines", len(doubtful))
+        retry_map = query_batch([lines[i] for i, _, _ in doubtful], pool, compact, reuse_context, keep_alive)
+    
+    for n, (i, result, confidence) in enumerate(doubtful):
+        retry = retry_map.get(n + 1)
+        if retry:
+            retry_confidence = confidence_score(lines[i], retry, fallbacks[i])
+            if retry_confidence > confidence:
+                result, confidence = retry, retry_confidence
+        if confidence >= min_confidence:
+            chosen[i] = (result, confidence)
+        else:
+            count_stat("low_confidence_lines")
     
     # Processa cada linha - SEMPRE retorna algo
+    results = []
     for i, line in enumerate(lines):
-        line_num = i + 1
-        result = results_map.get(line_num)
-        
-        if result and validate_result(result):
+        if i in chosen:
             # IA conseguiu extrair
-            results.append({
-                "url": result.get("url", "").strip(),
-                "login": result.get("login", "").strip(),
-                "password": result.get("password", "").strip()
-            })
+            result, confidence = chosen[i]
+            results.append(result)
+            count_stat("confidence_sum", confidence)
         else:
             # Fallback: parsing forçado
-            fallback = fallback_parse(line)
-            results.append(fallback)
+            results.append(fallbacks[i])
     
+    count_stat("ai_lines", len(chosen))
+    count_stat("fallback_lines", len(lines) - len(chosen))
     return results
 
 
-def process_file(input_file: str, output_file: str, batch_size: int = 5):
-    """Processa o arquivo de entrada completo - MODO FORÇADO."""
-    
-    # Lê todas as linhas
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = [line.strip() for line in f.readlines()]
+def read_checkpoint(checkpoint_file: str) -> Optional[dict]:
+    """Lê o checkpoint de progresso, se existir."""
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def write_checkpoint(checkpoint_file: str, state: dict):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)."""
+    tmp_file = checkpoint_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, checkpoint_file)
+
+
+def iter_batches(input_file: str, batch_size: int, start_offset: int = 0, start_line: int = 0):
+    """
+    Lê o arquivo em streaming e gera batches de linhas não vazias.
+    Cada batch é uma lista de (número_da_linha, linha) mais o offset em bytes
+    logo após a última linha do batch, usado para retomar o processamento.
+    """
+    batch = []
+    line_num = start_line
+    with open(input_file, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for raw in f:
+            offset += len(raw)
+            line_num += 1
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+            batch.append((line_num, line))
+            if len(batch) >= batch_size:
+                yield batch, offset
+                batch = []
+        if batch:
+            yield batch, offset
+
+
+def process_file(
+    input_file: str,
+    output_file: str,
+    batch_size: int = 5,
+    resume: bool = False,
+    workers: int = WORKERS,
+    delay: float = BATCH_DELAY,
+    endpoints: Optional[list[str]] = None,
+    compact: bool = False,
+    reuse_context: bool = False,
+    keep_alive: Optional[str] = None,
+    min_confidence: float = MIN_CONFIDENCE,
+    requery: bool = True,
+):
+    """
+    Processa o arquivo de entrada em streaming - MODO FORÇADO.
+
+    Os resultados são gravados no CSV ao fim de cada batch e o progresso é
+    salvo em <output>.progress, permitindo retomar com resume=True após uma
+    interrupção. Com workers > 1 vários batches ficam em andamento ao mesmo
+    tempo, mas a escrita no CSV continua na ordem do arquivo.
+    Os batches são distribuídos entre os endpoints informados (padrão:
+    OLLAMA_API_URL). compact usa o cabeçalho mínimo com resposta em TSV.
+    Resultados da IA abaixo de min_confidence são reconsultados (requery)
+    e, se continuarem duvidosos, substituídos pelo fallback_parse.
+    """
+    pool = EndpointPool(endpoints or [OLLAMA_API_URL])
+    checkpoint_file = output_file + CHECKPOINT_SUFFIX
+    input_size = os.path.getsize(input_file)
+    state = {
+        "input": os.path.abspath(input_file),
+        "line": 0,
+        "input_offset": 0,
+        "output_offset": 0,
+        "processed": 0,
+        "extracted": 0,
+        "done": False,
+    }
     
-    # Remove linhas vazias
-    lines = [(i, line) for i, line in enumerate(lines, 1) if line]
-    total_lines = len(lines)
+    if resume:
+        saved = read_checkpoint(checkpoint_file)
+        if saved and saved.get("input") == state["input"] and os.path.isfile(output_file):
+            state.update(saved)
+        else:
+            print(f"\nAviso: Nenhum checkpoint válido em {checkpoint_file}, iniciando do zero.")
+            resume = False
     
     print(f"\n📁 Arquivo: {input_file}")
-    print(f"📊 Total de linhas: {total_lines}")
     print(f"📦 Tamanho do batch: {batch_size}")
+    print(f"🧵 Workers: {workers}")
     print(f"🤖 Modelo: {MODEL_NAME}")
-    print(f"\n⏳ Processando...\n")
+    print(f"📝 Prompt: {'compacto (TSV)' if compact else 'padrão (JSON)'}"
+          f"{' + context' if compact and reuse_context else ''}")
+    print(f"🌐 Endpoints: {', '.join(e.url for e in pool.endpoints)}")
+    
+    if state["done"]:
+        print(f"\n✅ Arquivo já processado por completo ({state['extracted']} registros em {output_file})")
+        return
+    
+    if resume:
+        print(f"🔁 Retomando após a linha {state['line']}")
+        # Descarta qualquer escrita parcial posterior ao último checkpoint
+        with open(output_file, 'r+b') as f:
+            f.truncate(state["output_offset"])
+    else:
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            csv.DictWriter(f, fieldnames=CSV_FIELDS).writeheader()
+            state["output_offset"] = f.tell()
+        write_checkpoint(checkpoint_file, state)
     
-    all_results = []
-    processed = 0
+    print(f"\n⏳ Processando...\n")
     
-    # Processa em batches
-    for i in range(0, len(lines), batch_size):
-        batch_lines_with_idx = lines[i:i + batch_size]
-        batch_lines = [line for _, line in batch_lines_with_idx]
-        batch_offset = batch_lines_with_idx[0][0] - 1
+    start_time = time.monotonic()
+    batches = iter_batches(input_file, batch_size, state["input_offset"], state["line"])
+    pending = deque()
+    
+    def submit_next(executor) -> bool:
+        """Agenda o próximo batch do arquivo; retorna False quando acabar."""
+        item = next(batches, None)
+        if item is None:
+            return False
+        batch, input_offset = item
+        batch_lines = [line for _, line in batch]
+        batch_offset = batch[0][0] - 1
+        future = executor.submit(process_batch, batch_lines, batch_offset, pool,
+                                 compact, reuse_context, keep_alive, min_confidence, requery)
+        pending.append((batch, input_offset, future))
+        return True
+    
+    with open(output_file, 'a', newline='', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
         
-        results = process_batch(batch_lines, batch_offset)
-        
-        for r in results:
-            if r.get("url") or r.get("login") or r.get("password"):
-                all_results.append(r)
-        
-        processed += len(batch_lines)
-        progress = (processed / total_lines) * 100
-        print(f"\r  Progresso: {processed}/{total_lines} ({progress:.1f}%) | Extraídos: {len(all_results)}", end="", flush=True)
+        # Mantém no máximo 2x workers batches em memória
+        for _ in range(workers * 2):
+            if not submit_next(executor):
+                break
         
-        time.sleep(0.3)
+        while pending:
+            batch, input_offset, future = pending.popleft()
+            try:
+                results = future.result()
+            except OllamaUnavailable:
+                # Batches ainda na fila não chegam a rodar; o checkpoint continua
+                # no último batch gravado, então --resume retoma daqui
+                for _, _, queued in pending:
+                    queued.cancel()
+                raise
+            
+            for r in results:
+                if r.get("url") or r.get("login") or r.get("password"):
+                    writer.writerow(r)
+                    state["extracted"] += 1
+            
+            # Garante que o batch está em disco antes de avançar o checkpoint
+            out.flush()
+            os.fsync(out.fileno())
+            
+            state["line"] = batch[-1][0]
+            state["input_offset"] = input_offset
+            state["output_offset"] = out.tell()
+            state["processed"] += len(batch)
+            write_checkpoint(checkpoint_file, state)
+            
+            progress = (input_offset / input_size) * 100 if input_size else 100.0
+            print(f"\r  Progresso: linha {state['line']} ({progress:.1f}%) | Processadas: {state['processed']} | Extraídos: {state['extracted']}", end="", flush=True)
+            
+            if delay:
+                time.sleep(delay)
+            submit_next(executor)
     
-    print("\n")
+    state["done"] = True
+    write_checkpoint(checkpoint_file, state)
     
-    # Salva resultados CSV
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['url', 'login', 'password'])
-        writer.writeheader()
-        writer.writerows(all_results)
+    print("\n")
     
     # Estatísticas finais
     print("=" * 50)
     print("📊 RESULTADO FINAL")
     print("=" * 50)
-    print(f"  📥 Linhas processadas: {total_lines}")
-    print(f"  ✅ Registros extraídos: {len(all_results)}")
+    print(f"  📥 Linhas processadas: {state['processed']}")
+    print(f"  ✅ Registros extraídos: {state['extracted']}")
+    print(f"  🤖 Linhas via IA: {STATS['ai_lines']} | Fallback: {STATS['fallback_lines']}")
+    if STATS['ai_lines']:
+        print(f"  🎯 Confiança média (IA): {STATS['confidence_sum'] / STATS['ai_lines']:.2f} | "
+              f"Reconsultadas: {STATS['requeried_lines']} | Baixa confiança: {STATS['low_confidence_lines']}")
+    lines_sent = STATS['ai_lines'] + STATS['fallback_lines']
+    if lines_sent:
+        per_line = (STATS['prompt_tokens'] + STATS['eval_tokens']) / lines_sent
+        print(f"  🔢 Tokens por linha: {per_line:.1f} "
+              f"(prompt: {STATS['prompt_tokens'] / lines_sent:.1f} | resposta: {STATS['eval_tokens'] / lines_sent:.1f})")
+    pool.report(time.monotonic() - start_time)
     print(f"  📁 Output CSV: {output_file}")
     print("=" * 50)
 
@@ -302,6 +828,9 @@ def main():
 Exemplos:
   bird-leak-cleaner.py -f dados.txt -o resultado.csv
   bird-leak-cleaner.py -f leak.txt
+  bird-leak-cleaner.py -f leak.txt -o resultado.csv --resume
+  bird-leak-cleaner.py -f leak.txt --api-url gpu1:11434 --api-url gpu2:11434 --workers 4
+  bird-leak-cleaner.py -f leak.txt --compact --reuse-context --keep-alive 30m
         """
     )
     
@@ -320,8 +849,67 @@ Exemplos:
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=BATCH_SIZE,
-        help=f'Número de linhas por batch (padrão: {BATCH_SIZE})'
+        default=None,
+        help=f'Número de linhas por batch (padrão: {BATCH_SIZE}, ou {COMPACT_BATCH_SIZE} com --compact)'
+    )
+    
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Prompt compacto: cabeçalho mínimo, batches maiores e resposta em TSV'
+    )
+    
+    parser.add_argument(
+        '--reuse-context',
+        action='store_true',
+        help='Com --compact, avalia o cabeçalho uma vez por endpoint e reutiliza o context'
+    )
+    
+    parser.add_argument(
+        '--min-confidence',
+        type=float,
+        default=MIN_CONFIDENCE,
+        help=f'Confiança mínima para aceitar o resultado da IA (padrão: {MIN_CONFIDENCE})'
+    )
+    
+    parser.add_argument(
+        '--no-requery',
+        action='store_true',
+        help='Não reconsulta linhas de baixa confiança (usa o fallback direto)'
+    )
+    
+    parser.add_argument(
+        '--keep-alive',
+        default=None,
+        help='Tempo que o servidor mantém o modelo carregado (ex: 30m)'
+    )
+    
+    parser.add_argument(
+        '--api-url',
+        action='append',
+        default=None,
+        help='Endpoint Ollama (host:porta ou URL); pode repetir ou separar por vírgula '
+             f'(padrão: ${OLLAMA_API_URLS_ENV} ou {OLLAMA_API_URL})'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Batches processados em paralelo (padrão: número de endpoints)'
+    )
+    
+    parser.add_argument(
+        '--delay',
+        type=float,
+        default=BATCH_DELAY,
+        help=f'Pausa em segundos entre batches (padrão: {BATCH_DELAY})'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Retoma a partir da última linha concluída (checkpoint <output>.progress)'
     )
     
     args = parser.parse_args()
@@ -340,9 +928,35 @@ Exemplos:
     
     # Atualiza batch size se especificado
     batch_size = args.batch_size
+    if batch_size is None:
+        batch_size = COMPACT_BATCH_SIZE if args.compact else BATCH_SIZE
+    
+    # Define endpoints (argumentos > variável de ambiente > padrão)
+    raw_endpoints = args.api_url or [os.environ.get(OLLAMA_API_URLS_ENV, OLLAMA_API_URL)]
+    endpoints = [e for item in raw_endpoints for e in item.split(',') if e.strip()]
+    workers = args.workers if args.workers is not None else len(endpoints)
     
     # Processa
-    process_file(args.file, output_file, batch_size)
+    try:
+        process_file(
+            args.file,
+            output_file,
+            batch_size,
+            resume=args.resume,
+            workers=max(1, workers),
+            delay=args.delay,
+            endpoints=endpoints,
+            compact=args.compact,
+            reuse_context=args.reuse_context,
+            keep_alive=args.keep_alive,
+            min_confidence=args.min_confidence,
+            requery=not args.no_requery,
+        )
+    except OllamaUnavailable as e:
+        print(f"\n\nErro: {e}. Verifique se está rodando.")
+        print("Execute: ollama serve")
+        print(f"Para continuar depois: --resume (checkpoint em {output_file}{CHECKPOINT_SUFFIX})")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
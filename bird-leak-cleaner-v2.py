@@ -12,6 +12,7 @@ Data: 2026-01-20
 
 import argparse
 import csv
+import importlib.util
 import os
 import re
 import sys
@@ -28,6 +29,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def load_script(filename: str):
+    """
+    Importa um script irmão (nome com hífens) como módulo, registrado em
+    sys.modules: quem já o carregou (ex.: o searcher v3) recebe o mesmo objeto.
+    """
+    name = os.path.splitext(filename)[0].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+domains = load_script('bird-domains.py')
+
+
 @dataclass
 class ParsedLine:
     """Estrutura para armazenar dados parseados de uma linha."""
@@ -812,7 +836,8 @@ class LeakParser:
         self, 
         input_path: str, 
         output_dir: str,
-        deduplicate: bool = True
+        deduplicate: bool = True,
+        domain_column: bool = False
     ) -> Dict[str, int]:
         """
         Processa arquivo de entrada e gera arquivos de saída.
@@ -825,6 +850,7 @@ class LeakParser:
             input_path: Caminho do arquivo de entrada
             output_dir: Diretório para arquivos de saída
             deduplicate: Se True, remove duplicatas
+            domain_column: Se True, adiciona a coluna domain (domínio canônico da URL)
         
         Returns:
             Estatísticas do processamento
@@ -913,7 +939,7 @@ class LeakParser:
                     self.stats['out_of_pattern'] += 1
             
             # Escrever ULP combinado e out-of-pattern
-            self._write_csv_combined(combined_path, combined)
+            self._write_csv_combined(combined_path, combined, domain_column)
             self._write_text(out_of_pattern_path, out_of_pattern)
             
             logger.info(f"Processamento concluído!")
@@ -936,14 +962,20 @@ class LeakParser:
     def _write_csv_combined(
         self, 
         path: str, 
-        data: List[Tuple[str, str, str]]
+        data: List[Tuple[str, str, str]],
+        domain_column: bool = False
     ) -> None:
-        """Escreve CSV combinado com URL, Login, Password."""
+        """Escreve CSV combinado com URL, Login, Password (e Domain, se pedido)."""
         with open(path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow(['url', 'login', 'password'])
-            for url, login, password in data:
-                writer.writerow([url, login, password])
+            if domain_column:
+                writer.writerow(['url', 'login', 'password', 'domain'])
+                for url, login, password in data:
+                    writer.writerow([url, login, password, domains.canonical_domain(url) or ''])
+            else:
+                writer.writerow(['url', 'login', 'password'])
+                for url, login, password in data:
+                    writer.writerow([url, login, password])
         logger.info(f"  Escrito: {path} ({len(data)} registros)")
     
     def _write_text(self, path: str, data: List[str]) -> None:
@@ -964,6 +996,7 @@ Exemplos de uso:
   %(prog)s --input leak --output ./output
   %(prog)s -i dados.txt -o ./resultado --no-dedup
   %(prog)s -i leak -o ./output --verbose
+  %(prog)s -i leak -o ./output --domain-column
         """
     )
     
@@ -985,6 +1018,12 @@ Exemplos de uso:
         help='Não remover duplicatas'
     )
     
+    parser.add_argument(
+        '--domain-column',
+        action='store_true',
+        help='Adiciona a coluna domain (ex: https://www.empresa.com.br:443 -> empresa.com.br)'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -1009,7 +1048,8 @@ Exemplos de uso:
         stats = leak_parser.process_file(
             input_path=args.input,
             output_dir=args.output,
-            deduplicate=not args.no_dedup
+            deduplicate=not args.no_dedup,
+            domain_column=args.domain_column
         )
         
         # Verificar se o processamento foi bem-sucedido
@@ -0,0 +1,2010 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bird Leak Searcher v3 - Busca em leaks com índice invertido persistente
+
+Substitui o bird-leak-searcher-v2.sh: em vez de rodar um `rg` completo em
+todos os discos a cada termo, o comando `index` monta (uma vez) um índice
+invertido por disco, em SQLite, com chaves de domínio registrável, domínio
+de email e tokens de login apontando para (arquivo, offset em bytes).
+O comando `query` resolve o termo no índice e lê apenas as linhas
+correspondentes.
+
+Os domínios passam pela canonicalização do bird-domains.py (domínio
+registrável, sem www/porta, pacotes android:// invertidos), então uma
+consulta por empresa.com.br encontra https://www.empresa.com.br:443/login e
+android://...@br.com.empresa.app com uma única chave do índice.
+
+Com `index --trigrams` também é montado um índice de trigramas por bloco
+do disco (postings delta-codificados e comprimidos). O comando `substring`
+intersecta as listas de blocos dos trigramas do termo e só varre os blocos
+candidatos, permitindo buscar trechos arbitrários (parte de senha, caminho
+de URL, nome de empresa).
+
+Com `index --bloom`, cada bloco do disco ganha um filtro de Bloom com as
+mesmas chaves do índice invertido (domínios, emails, logins). Com
+`--no-postings` o índice guarda só os filtros, ficando bem menor: o
+`query` então lê apenas os blocos cujo filtro responde "talvez" e confirma
+as chaves linha a linha, pulando todo bloco que certamente não tem o termo.
+
+O comando `batch` recebe um arquivo com vários termos, compila todos em um
+único autômato Aho–Corasick e varre cada disco uma só vez, separando as
+linhas encontradas em um arquivo de saída por termo.
+
+Com `--ulp`, os comandos de busca passam cada linha encontrada direto pelo
+LeakParser do bird-leak-cleaner-v2.py e gravam os registros URL/login/senha
+já deduplicados (ULP-<termo>-<disco>.csv e ulp_combined.csv por termo), sem
+o arquivo bruto intermediário nem a releitura pelo cleaner.
+
+Arquivos compactados (.zip, .tar, .tar.gz/.tgz, .tar.bz2, .tar.xz, .gz,
+.bz2, .xz e, com o pacote zstandard, .zst/.tar.zst) são lidos em fluxo,
+sem extração: cada membro é indexado e varrido como um arquivo próprio,
+identificado como "arquivo.zip!membro.txt". Nas varreduras completas a
+descompressão roda em paralelo, um arquivo compactado por núcleo.
+
+Com `--jsonl`, cada disco também gera um fluxo JSONL (RESULT-*.jsonl) com
+um registro "hit" por linha encontrada (termo, disco, arquivo, offset em
+bytes e linha) e um registro "summary" com bytes e arquivos lidos, vazão,
+tempo e total de linhas, para acompanhar o desempenho das buscas e
+alimentar outras ferramentas.
+
+O índice guarda um manifesto (caminho, tamanho, mtime, hash do conteúdo)
+dos arquivos indexados. Rodar `index` de novo só processa arquivos novos ou
+alterados e remove do índice os arquivos apagados; `index --full` força a
+reconstrução completa.
+
+Os comandos que varrem vários discos em paralelo (`index` e `batch`) passam
+por um escalonador de I/O: os discos são agrupados pelo dispositivo físico
+(detectado em /sys/dev/block), com no máximo --hdd-readers leitores
+simultâneos por disco giratório e --ssd-readers por SSD. Dentro de cada
+disco os arquivos são lidos em ordem de inode, aproximando leitura
+sequencial, e o MB/s de cada disco é reportado ao final.
+
+Uso:
+    bird-leak-searcher-v3.py index
+    bird-leak-searcher-v3.py query empresa.com.br
+    bird-leak-searcher-v3.py query joao@empresa.com.br
+    bird-leak-searcher-v3.py index --trigrams
+    bird-leak-searcher-v3.py substring "/wp-admin/"
+    bird-leak-searcher-v3.py index --bloom --no-postings
+    bird-leak-searcher-v3.py batch -T dominios-clientes.txt
+    bird-leak-searcher-v3.py query empresa.com.br --ulp
+    bird-leak-searcher-v3.py batch -T dominios-clientes.txt --jsonl
+
+Autor: Bird Leak Searcher
+"""
+
+import argparse
+import bz2
+import contextlib
+import csv
+import glob
+import gzip
+import hashlib
+import importlib.util
+import json
+import logging
+import lzma
+import os
+import re
+import sqlite3
+import stat
+import sys
+import tarfile
+import time
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick  # pyahocorasick (opcional, implementação em C)
+except ImportError:
+    ahocorasick = None
+
+try:
+    import zstandard  # opcional, para .zst
+except ImportError:
+    zstandard = None
+
+# Configuração de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Config:
+    """Caminhos e parâmetros padrão (os mesmos do bird-leak-searcher-v2.sh)."""
+    BASE_DIR = "/media/unknown"
+    OUTPUT_DIR = "/home/unknown/Desktop/LEAK-LEAKED"
+    INDEX_DIR = "/home/unknown/Desktop/LEAK-INDEX"
+    INDEX_SUFFIX = ".idx.db"
+    INSERT_CHUNK = 100_000
+    BLOCK_SIZE = 64 * 1024
+    SEGMENT_BLOCKS = 4096
+    HDD_READERS = 1
+    SSD_READERS = 4
+    DECOMPRESS_WORKERS = os.cpu_count() or 2
+    BLOOM_BITS_PER_KEY = 10   # ~1% de falsos positivos com 7 hashes
+    BLOOM_HASHES = 7
+    MAX_OPEN_OUTPUTS = 256    # saídas por termo abertas ao mesmo tempo no batch (2 arquivos com --ulp)
+
+
+def load_script(filename: str):
+    """
+    Importa um script irmão (nome com hífens) como módulo, uma única vez:
+    o módulo fica em sys.modules, onde o cleaner v2 também procura.
+    """
+    name = os.path.splitext(filename)[0].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(SCRIPT_DIR, filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+domains = load_script('bird-domains.py')
+# URLExtractor (divisão URL/credenciais) e LeakParser do cleaner v2
+cleaner = load_script('bird-leak-cleaner-v2.py')
+
+
+class Tokenizer:
+    """Extrai as chaves do índice de uma linha (bytes, já em minúsculas)."""
+
+    # Muda quando as chaves geradas mudam; índices de outra versão são reconstruídos
+    VERSION = 3
+
+    ANDROID_PATTERN = re.compile(rb'android://[^@\s/]*@([a-z0-9_.\-]+)')
+    EMAIL_PATTERN = re.compile(rb'[a-z0-9._%+\-]+@((?:[a-z0-9\-]+\.)+[a-z]{2,})')
+    HOST_PATTERN = re.compile(rb'(?:[a-z][a-z0-9+.\-]*://)?((?:[a-z0-9\-]+\.)+[a-z]{2,})(?![a-z0-9\-])')
+    LOGIN_PATTERN = re.compile(rb'[a-z0-9._\-]{3,64}')
+    PORT_PATTERN = re.compile(r':\d{1,5}(?:/|$)')
+    SEPARATORS = ':|; '
+
+    @classmethod
+    def split_url(cls, text: str) -> Tuple[Optional[str], str]:
+        """
+        Separa a URL (esquema, autoridade e caminho) do resto da linha com o
+        mesmo URLExtractor do LeakParser. Domínio sem esquema no início só
+        conta como URL com caminho, porta ou mais campos depois dele, para
+        que "joao.silva:senha" continue sendo login:senha.
+        """
+        extractor = cleaner.URLExtractor
+        text = text.strip()
+        url, rest = extractor.extract_url_from_start(text)
+        if url and '://' not in url:
+            follows = text[len(url):len(url) + 1]
+            has_fields = any(sep in rest for sep in cls.SEPARATORS)
+            if (follows and follows not in cls.SEPARATORS) or not (
+                    '/' in url or cls.PORT_PATTERN.search(url) or not rest or has_fields):
+                url, rest = None, text
+        if url is None:
+            url, rest = extractor.extract_url_from_anywhere(text)
+        if url and '://' in url:
+            # https://site.com:login:senha (sem caminho): o ':' que não é porta fecha a URL
+            end = extractor._find_path_end(url, url.index('://') + 3)
+            if end < len(url):
+                url, rest = url[:end], f"{url[end:].lstrip(':')} {rest}".strip()
+        if url is None and ' ' in text:
+            # login:senha domínio.com.br
+            head, last = text.rsplit(' ', 1)
+            if '@' not in last and extractor.DOMAIN_START_PATTERN.fullmatch(last):
+                url, rest = last, head
+        return url, rest
+
+    @classmethod
+    def keys(cls, line: bytes) -> Set[str]:
+        """
+        Chaves geradas:
+          d:<domínio registrável>   host da URL da linha
+          e:<domínio registrável>   domínio dos emails
+          l:<login>                 email ou primeiro campo de credencial depois da URL
+        """
+        keys = set()
+        # URIs android://hash@pacote viram o domínio do pacote invertido
+        rest = line
+        if b'android://' in line:
+            for match in cls.ANDROID_PATTERN.finditer(line):
+                host = domains.android_package_host(match.group(1).decode('ascii', 'ignore'))
+                keys.add('d:' + domains.registrable_domain(host))
+            rest = cls.ANDROID_PATTERN.sub(b' ', line)
+
+        # A URL inteira sai antes de procurar o login: caminhos como /login
+        # ou /auth/realms/x não viram chaves l: nem d:
+        url, credentials = cls.split_url(rest.decode('latin-1'))
+        if url:
+            host = domains.canonical_host(url)
+            if host and cls.HOST_PATTERN.fullmatch(host.encode('latin-1')):
+                keys.add('d:' + domains.registrable_domain(host))
+        rest = credentials.encode('latin-1')
+
+        emails = False
+        for match in cls.EMAIL_PATTERN.finditer(rest):
+            emails = True
+            keys.add('l:' + match.group(0).decode('ascii', 'ignore'))
+            keys.add('e:' + domains.registrable_domain(match.group(1).decode('ascii', 'ignore')))
+
+        if not emails:
+            login = cls.LOGIN_PATTERN.search(rest)
+            if login:
+                keys.add('l:' + login.group(0).decode('ascii', 'ignore'))
+        return keys
+
+
+def classify_term(term: str) -> List[str]:
+    """Converte o termo de busca nas chaves do índice que podem contê-lo."""
+    term = term.strip().lower()
+    if not term:
+        return []
+
+    if term.startswith('android://'):
+        domain = domains.canonical_domain(term)
+        return ['d:' + domain] if domain else []
+
+    if '@' in term and not term.startswith('@') and '://' not in term:
+        return ['l:' + term]
+
+    host_match = Tokenizer.HOST_PATTERN.search(term.lstrip('@').encode('utf-8', 'ignore'))
+    if host_match:
+        domain = domains.registrable_domain(domains.canonical_host(host_match.group(1).decode('ascii', 'ignore')))
+        if term.startswith('@'):
+            return ['e:' + domain]
+        return ['d:' + domain, 'e:' + domain]
+
+    return ['l:' + term]
+
+
+def key_needles(keys: List[str]) -> List[bytes]:
+    """
+    Trechos que toda linha com alguma das chaves contém: o maior rótulo do
+    domínio (a ordem dos rótulos muda em android://, os rótulos não) ou o
+    login inteiro. Uma linha sem nenhum deles dispensa o Tokenizer.
+    """
+    needles = []
+    for key in keys:
+        kind, value = key.split(':', 1)
+        needle = max(value.split('.'), key=len) if kind in ('d', 'e') else value
+        needles.append(needle.encode('utf-8'))
+    return needles
+
+
+def iter_lines_with_offsets(f: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """Lê o fluxo binário gerando (offset_em_bytes, linha)."""
+    offset = 0
+    for line in f:
+        yield offset, line
+        offset += len(line)
+
+
+# Separador entre o caminho do arquivo compactado e o membro
+MEMBER_SEP = '!'
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz', '.tar.zst', '.tzst')
+SINGLE_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+
+def archive_kind(path: str) -> Optional[str]:
+    """'zip', 'tar' ou 'single' (um arquivo comprimido), ou None se não for compactado."""
+    lower = path.lower()
+    if lower.endswith('.zip'):
+        return 'zip'
+    if lower.endswith(TAR_SUFFIXES):
+        if lower.endswith(('.zst', '.tzst')) and zstandard is None:
+            return None
+        return 'tar'
+    if lower.endswith(SINGLE_SUFFIXES):
+        if lower.endswith('.zst') and zstandard is None:
+            return None
+        return 'single'
+    return None
+
+
+def split_location(location: str) -> Tuple[str, Optional[str]]:
+    """Separa "arquivo.zip!membro" em (arquivo, membro); caminhos comuns têm membro None."""
+    idx = location.find(MEMBER_SEP)
+    while idx != -1:
+        if archive_kind(location[:idx]):
+            return location[:idx], location[idx + 1:]
+        idx = location.find(MEMBER_SEP, idx + 1)
+    return location, None
+
+
+# Erros de leitura de arquivos comuns ou compactados corrompidos/truncados
+READ_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError, lzma.LZMAError, zlib.error)
+if zstandard is not None:
+    READ_ERRORS += (zstandard.ZstdError,)
+
+
+def _open_compressed(path: str) -> BinaryIO:
+    """Abre um arquivo comprimido (sem tar) como fluxo descomprimido."""
+    lower = path.lower()
+    if lower.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if lower.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if lower.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+
+def iter_members(path: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Percorre os membros de um arquivo compactado em fluxo, gerando
+    (nome do membro, fluxo binário). Cada fluxo só é válido até o próximo.
+    """
+    kind = archive_kind(path)
+    if kind == 'zip':
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                try:
+                    f = zf.open(info)
+                except (RuntimeError, NotImplementedError) as e:
+                    # Membro cifrado ou com método de compressão não suportado:
+                    # pula só ele, os demais membros continuam legíveis
+                    logger.warning(f"Ignorando {path}{MEMBER_SEP}{info.filename}: {e}")
+                    continue
+                with f:
+                    yield info.filename, f
+    elif kind == 'tar':
+        if path.lower().endswith(('.zst', '.tzst')):
+            raw = _open_compressed(path)
+            tar = tarfile.open(fileobj=raw, mode='r|')
+        else:
+            raw = None
+            tar = tarfile.open(path, mode='r|*')
+        try:
+            for member in tar:
+                if member.isfile():
+                    yield member.name, tar.extractfile(member)
+        finally:
+            tar.close()
+            if raw is not None:
+                raw.close()
+    elif kind == 'single':
+        name = os.path.basename(path)
+        with _open_compressed(path) as f:
+            yield name[:name.rfind('.')], f
+
+
+@contextlib.contextmanager
+def open_location(location: str) -> Iterator[BinaryIO]:
+    """Abre um arquivo comum ou um membro ("arquivo!membro") para leitura sequencial."""
+    path, member = split_location(location)
+    if member is None:
+        with open(path, 'rb') as f:
+            yield f
+        return
+    for name, f in iter_members(path):
+        if name == member:
+            yield f
+            return
+    raise FileNotFoundError(f"Membro não encontrado: {location}")
+
+
+def read_ranges(location: str, ranges: List[Tuple[int, int]]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Lê os trechos (offset, tamanho), em ordem crescente de offset. Arquivos
+    comuns usam seek; membros compactados são descomprimidos uma única vez,
+    descartando o que fica entre os trechos.
+    """
+    with open_location(location) as f:
+        seekable = split_location(location)[1] is None
+        pos = 0
+        for offset, length in ranges:
+            if seekable:
+                f.seek(offset)
+            else:
+                skip_forward(f, offset - pos)
+            data = f.read(length) if length >= 0 else f.readline()
+            pos = offset + len(data)
+            yield offset, data
+
+
+def skip_forward(f: BinaryIO, count: int):
+    """Descarta count bytes de um fluxo sem seek."""
+    while count > 0:
+        chunk = f.read(min(count, 1 << 20))
+        if not chunk:
+            break
+        count -= len(chunk)
+
+
+def iter_files(disk_path: str, skip: Optional[Set[str]] = None) -> Iterator[str]:
+    """
+    Percorre o disco retornando os arquivos regulares em ordem de inode,
+    que nos sistemas de arquivos comuns acompanha a posição no disco e
+    evita saltos da cabeça de leitura em discos giratórios.
+    """
+    skip = skip or set()
+    found = []
+    for root, dirs, files in os.walk(disk_path, onerror=lambda e: logger.warning(f"Ignorando: {e}")):
+        for name in files:
+            path = os.path.join(root, name)
+            if path in skip:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                logger.warning(f"Ignorando: {e}")
+                continue
+            if stat.S_ISREG(st.st_mode):
+                found.append((st.st_ino, path))
+    found.sort()
+    for _, path in found:
+        yield path
+
+
+def encode_postings(ids: List[int]) -> bytes:
+    """Codifica ids crescentes como deltas varint comprimidos com zlib."""
+    out = bytearray()
+    previous = 0
+    for value in ids:
+        delta = value - previous
+        previous = value
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return zlib.compress(bytes(out))
+
+
+def decode_postings(blob: bytes) -> List[int]:
+    """Inverso de encode_postings."""
+    ids = []
+    value = 0
+    shift = 0
+    current = 0
+    for byte in zlib.decompress(blob):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += value
+        ids.append(current)
+        value = 0
+        shift = 0
+    return ids
+
+
+def trigrams_of(data: bytes) -> Set[bytes]:
+    """Trigramas distintos de um trecho (já em minúsculas), sem atravessar quebras de linha."""
+    tris = set()
+    for line in data.split(b'\n'):
+        tris.update(line[i:i + 3] for i in range(len(line) - 2))
+    return tris
+
+
+class BloomFilter:
+    """Filtro de Bloom em bytearray, com as k posições geradas por dupla hash."""
+
+    def __init__(self, bits: bytearray, hashes: int = Config.BLOOM_HASHES):
+        self.bits = bits
+        self.size = len(bits) * 8
+        self.hashes = hashes
+
+    @classmethod
+    def for_keys(cls, keys: Set[str]) -> 'BloomFilter':
+        """Cria o filtro dimensionado para o conjunto de chaves e as insere."""
+        size = max(64, len(keys) * Config.BLOOM_BITS_PER_KEY)
+        bloom = cls(bytearray((size + 7) // 8))
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    @staticmethod
+    def hash_key(key: str) -> Tuple[int, int]:
+        """(h1, h2) da chave; independe do tamanho do filtro, então serve para todos os blocos."""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, hashed: Tuple[int, int]) -> Iterator[int]:
+        h1, h2 = hashed
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(self.hash_key(key)):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_hash(self.hash_key(key))
+
+    def contains_hash(self, hashed: Tuple[int, int]) -> bool:
+        """Como `in`, mas com a chave já passada por hash_key."""
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hashed))
+
+
+class TrigramBuilder:
+    """
+    Acumula trigrama -> [ids de bloco] em memória e grava segmentos no índice
+    a cada Config.SEGMENT_BLOCKS blocos, limitando o uso de memória.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, first_segment: int = 0):
+        self.conn = conn
+        self.segment = first_segment
+        self.blocks = 0
+        self.postings: Dict[bytes, List[int]] = {}
+
+    def add_block(self, block_id: int, data: bytes):
+        for tri in trigrams_of(data.lower()):
+            self.postings.setdefault(tri, []).append(block_id)
+        self.blocks += 1
+        if self.blocks >= Config.SEGMENT_BLOCKS:
+            self.flush()
+
+    def flush(self):
+        if not self.postings:
+            return
+        self.conn.executemany(
+            "INSERT INTO trigrams (tri, segment, postings) VALUES (?, ?, ?)",
+            ((tri, self.segment, encode_postings(ids)) for tri, ids in self.postings.items())
+        )
+        self.segment += 1
+        self.blocks = 0
+        self.postings = {}
+
+    def discard(self):
+        """Descarta os postings pendentes (blocos de uma transação desfeita)."""
+        self.blocks = 0
+        self.postings = {}
+
+
+class AhoCorasick:
+    """
+    Autômato Aho–Corasick em Python puro, usado quando o pyahocorasick não
+    está instalado. Opera sobre str (linhas decodificadas como latin-1, que
+    mapeia cada byte em um caractere).
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[int, ...]] = [()]
+
+        for idx, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] += (idx,)
+
+        # Links de falha em largura (BFS); os filhos da raiz falham para a raiz
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                # Herda as saídas do maior sufixo próprio
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> Set[int]:
+        """Índices dos padrões presentes no texto."""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class MultiMatcher:
+    """Busca simultânea de vários termos (sem distinção de maiúsculas) em uma passada."""
+
+    def __init__(self, terms: List[str]):
+        patterns = [t.lower().encode('utf-8', 'ignore').decode('latin-1') for t in terms]
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for idx, pattern in enumerate(patterns):
+                if pattern:
+                    self.automaton.add_word(pattern, idx)
+            self.automaton.make_automaton()
+            self.backend = "pyahocorasick"
+        else:
+            self.automaton = AhoCorasick(patterns)
+            self.backend = "python"
+
+    def find(self, line: bytes) -> Set[int]:
+        """Índices dos termos presentes na linha."""
+        text = line.lower().decode('latin-1')
+        if self.backend == "pyahocorasick":
+            return {idx for _, idx in self.automaton.iter(text)}
+        return self.automaton.find(text)
+
+
+def safe_name(term: str) -> str:
+    """Nome de arquivo seguro para o termo ("/" não é válido em nomes)."""
+    return term.replace('/', '_')
+
+
+def load_terms(path: str) -> List[str]:
+    """Lê os termos do arquivo (um por linha, ignorando vazios, duplicados e #comentários)."""
+    terms = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            term = line.strip()
+            if term and not term.startswith('#') and term.lower() not in seen:
+                seen.add(term.lower())
+                terms.append(term)
+    return terms
+
+
+def load_leak_parser(verbose: bool = False):
+    """Cria um LeakParser do bird-leak-cleaner-v2.py."""
+    return cleaner.LeakParser(verbose=verbose)
+
+
+def ulp_paths(output_file: str) -> Tuple[str, str]:
+    """Caminhos do CSV ULP e do out-of-pattern correspondentes a LEAK-<termo>-<disco>.txt."""
+    directory, name = os.path.split(output_file)
+    stem = os.path.splitext(name)[0]
+    if stem.startswith('LEAK-'):
+        stem = stem[len('LEAK-'):]
+    return (os.path.join(directory, f"ULP-{stem}.csv"),
+            os.path.join(directory, f"OUT-OF-PATTERN-{stem}.txt"))
+
+
+class UlpWriter:
+    """
+    Saída estruturada: recebe as linhas brutas encontradas (bytes, como o
+    arquivo de saída comum) e grava url,login,password deduplicados com as
+    mesmas regras do process_file do cleaner v2. Depois de close() ainda
+    aceita linhas: os arquivos são reabertos em modo append.
+    """
+
+    def __init__(self, output_file: str):
+        self.csv_path, self.out_of_pattern_path = ulp_paths(output_file)
+        self.parser = load_leak_parser()
+        self.seen: Set[str] = set()
+        self.stats = {'ulp_records': 0, 'duplicates': 0, 'out_of_pattern': 0}
+        self._open('w')
+        self._csv.writerow(['url', 'login', 'password'])
+
+    def _open(self, mode: str):
+        self._csv_file = open(self.csv_path, mode, newline='', encoding='utf-8')
+        self._csv = csv.writer(self._csv_file)
+        self._oop = open(self.out_of_pattern_path, mode, encoding='utf-8')
+
+    def write(self, line: bytes):
+        if self._csv_file is None:
+            self._open('a')
+        try:
+            text = line.decode('utf-8')
+        except UnicodeDecodeError:
+            text = line.decode('latin-1')
+        if not text.strip():
+            return
+
+        result = self.parser.parse_line(text)
+        if not result.parse_success:
+            self._oop.write(text.strip() + '\n')
+            self.stats['out_of_pattern'] += 1
+            return
+
+        url = result.url or ""
+        login = result.login or ""
+        password = result.password or ""
+        key = f"{url}|{login}|{password}"
+        if key in self.seen:
+            self.stats['duplicates'] += 1
+            return
+        self.seen.add(key)
+
+        # Como no cleaner v2, só entram registros com pelo menos 2 componentes
+        if (url and login) or (url and password) or (login and password):
+            self._csv.writerow([url, login, password])
+            self.stats['ulp_records'] += 1
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._oop.close()
+            self._csv_file = self._oop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LineWriter:
+    """Saída bruta de linhas; como o UlpWriter, reabre em modo append se escrita após close()."""
+
+    def __init__(self, output_file: str):
+        self.path = output_file
+        self._file = open(output_file, 'wb')
+
+    def write(self, line: bytes):
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(line)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_output(output_file: str, ulp: bool = False):
+    """Abre a saída de um disco: LineWriter (linhas brutas) ou UlpWriter."""
+    if ulp:
+        return UlpWriter(output_file)
+    return LineWriter(output_file)
+
+
+class JsonlWriter:
+    """Fluxo JSONL de resultados de um disco: registros "hit" e, ao final, "summary"."""
+
+    def __init__(self, path: str, disk: str, mode: str = 'w'):
+        self.disk = disk
+        self._file = open(path, mode, encoding='utf-8')
+
+    def write(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def hit(self, term: str, location: str, offset: int, line: bytes):
+        self.write({
+            'type': 'hit',
+            'term': term,
+            'disk': self.disk,
+            'file': location,
+            'offset': offset,
+            'line': line.rstrip(b'\r\n').decode('utf-8', 'replace'),
+        })
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_jsonl(path: Optional[str], disk: str):
+    """Abre o fluxo JSONL de hits, ou um contexto vazio (None) sem --jsonl."""
+    if path is None:
+        return contextlib.nullcontext()
+    return JsonlWriter(path, disk)
+
+
+def batch_jsonl_path(output_dir: str, disk_path: str) -> str:
+    """Fluxo JSONL de um disco no comando batch (todos os termos juntos)."""
+    return os.path.join(output_dir, f"RESULT-BATCH-{os.path.basename(disk_path.rstrip('/'))}.jsonl")
+
+
+def write_summary(path: str, disk: str, command: str, terms: List[str], start: float, stats: Dict):
+    """Acrescenta ao fluxo JSONL o registro de resumo do disco."""
+    seconds = stats['seconds']
+    record = {
+        'type': 'summary',
+        'command': command,
+        'terms': terms,
+        'disk': disk,
+        'started_at': datetime.fromtimestamp(start).isoformat(timespec='seconds'),
+        'seconds': round(seconds, 3),
+        'bytes_scanned': stats['bytes'],
+        'files_scanned': stats['files'],
+        'mb_per_s': round(stats['bytes'] / 1e6 / seconds, 2) if seconds else 0.0,
+        'hits': stats['hits'],
+    }
+    for key in ('candidates', 'blocks', 'blooms', 'full_scan', 'archives', 'members', 'ulp_records'):
+        if key in stats:
+            record[key] = stats[key]
+    with JsonlWriter(path, disk, mode='a') as out:
+        out.write(record)
+
+
+def merge_ulp(output_dir: str, safe_term: str) -> int:
+    """Junta os ULP-<termo>-<disco>.csv em ulp_combined.csv, deduplicando entre discos."""
+    combined_path = os.path.join(output_dir, 'ulp_combined.csv')
+    seen: Set[Tuple[str, ...]] = set()
+    with open(combined_path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(['url', 'login', 'password'])
+        for path in sorted(glob.glob(os.path.join(glob.escape(output_dir), f"ULP-{glob.escape(safe_term)}-*.csv"))):
+            with open(path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    record = tuple(row)
+                    if record not in seen:
+                        seen.add(record)
+                        writer.writerow(row)
+    logger.info(f"  Escrito: {combined_path} ({len(seen)} registros)")
+    return len(seen)
+
+
+def list_disks(base_dir: str, names: Optional[List[str]] = None) -> List[str]:
+    """Lista os discos (subdiretórios) de base_dir, opcionalmente filtrados por nome."""
+    try:
+        disks = sorted(
+            os.path.join(base_dir, d) for d in os.listdir(base_dir)
+            if os.path.isdir(os.path.join(base_dir, d))
+        )
+    except FileNotFoundError:
+        logger.error(f"Diretório base não encontrado: {base_dir}")
+        return []
+    if names:
+        disks = [d for d in disks if os.path.basename(d) in names]
+    return disks
+
+
+def device_info(path: str) -> Tuple[str, Optional[bool]]:
+    """
+    Identifica o dispositivo físico de um caminho e se ele é giratório.
+    Partições são resolvidas para o disco inteiro; sem entrada em /sys
+    (tmpfs, overlay, rede) o tipo fica desconhecido (None).
+    """
+    st_dev = os.stat(path).st_dev
+    dev_id = f"{os.major(st_dev)}:{os.minor(st_dev)}"
+    sys_path = os.path.realpath(f"/sys/dev/block/{dev_id}")
+    if not os.path.isdir(sys_path):
+        return dev_id, None
+    if os.path.exists(os.path.join(sys_path, 'partition')):
+        sys_path = os.path.dirname(sys_path)
+    try:
+        with open(os.path.join(sys_path, 'queue', 'rotational')) as f:
+            rotational = f.read().strip() == '1'
+    except OSError:
+        rotational = None
+    return os.path.basename(sys_path), rotational
+
+
+class IOScheduler:
+    """
+    Distribui jobs por disco limitando os leitores simultâneos em cada
+    dispositivo físico: discos giratórios sofrem com leituras concorrentes,
+    SSDs aproveitam várias filas.
+    """
+
+    def __init__(
+        self,
+        disks: List[str],
+        hdd_readers: int = Config.HDD_READERS,
+        ssd_readers: int = Config.SSD_READERS,
+        profiles: Optional[Dict[str, str]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        profiles = profiles or {}
+        self.device_of: Dict[str, str] = {}
+        self.kind: Dict[str, str] = {}
+        self.groups: Dict[str, List[str]] = {}
+        for disk in disks:
+            name = os.path.basename(disk)
+            device, rotational = device_info(disk)
+            kind = profiles.get(name) or profiles.get(device)
+            if kind is None:
+                kind = {True: 'hdd', False: 'ssd', None: 'desconhecido'}[rotational]
+            self.device_of[disk] = device
+            self.kind[device] = kind
+            self.groups.setdefault(device, []).append(disk)
+        # Tipo desconhecido usa o limite de SSD (tmpfs/rede não têm cabeça de leitura)
+        self.limits = {
+            device: hdd_readers if kind == 'hdd' else ssd_readers
+            for device, kind in self.kind.items()
+        }
+        capacity = sum(min(self.limits[d], len(g)) for d, g in self.groups.items())
+        self.max_workers = max(1, min(capacity, max_workers or capacity))
+
+    def describe(self):
+        """Registra no log o agrupamento por dispositivo."""
+        for device, disks in self.groups.items():
+            names = ", ".join(os.path.basename(d) for d in disks)
+            logger.info(
+                f"Dispositivo {device} ({self.kind[device]}): {names} | "
+                f"leitores simultâneos: {self.limits[device]}"
+            )
+
+    def run(self, fn, *args) -> Iterator[Tuple[str, Future]]:
+        """Executa fn(disco, *args) respeitando os limites e retorna (disco, future) ao concluir."""
+        pending = {device: deque(disks) for device, disks in self.groups.items()}
+        running = {device: 0 for device in self.groups}
+        futures: Dict[Future, str] = {}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            def fill():
+                for device, queue in pending.items():
+                    while queue and running[device] < self.limits[device] and len(futures) < self.max_workers:
+                        disk = queue.popleft()
+                        futures[executor.submit(fn, disk, *args)] = disk
+                        running[device] += 1
+
+            fill()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    disk = futures.pop(future)
+                    running[self.device_of[disk]] -= 1
+                    yield disk, future
+                fill()
+
+
+def parse_profile(value: str) -> Tuple[str, str]:
+    """Converte --io-profile NOME=hdd|ssd (nome do disco ou do dispositivo)."""
+    name, _, kind = value.partition('=')
+    kind = kind.strip().lower()
+    if not name.strip() or kind not in ('hdd', 'ssd'):
+        raise argparse.ArgumentTypeError(f"perfil inválido: {value} (use NOME=hdd ou NOME=ssd)")
+    return name.strip(), kind
+
+
+class LeakIndex:
+    """Índice invertido de um disco, armazenado em SQLite."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            hash TEXT
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            key TEXT NOT NULL,
+            file_id INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            PRIMARY KEY (key, file_id, offset)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+        CREATE TABLE IF NOT EXISTS blocks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            bloom BLOB
+        );
+        CREATE INDEX IF NOT EXISTS blocks_file ON blocks (file_id);
+        CREATE TABLE IF NOT EXISTS trigrams (
+            tri BLOB NOT NULL,
+            segment INTEGER NOT NULL,
+            postings BLOB NOT NULL,
+            PRIMARY KEY (tri, segment)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(self.SCHEMA)
+        # Índices criados antes do manifesto/dos filtros não têm essas colunas
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if 'hash' not in columns:
+            self.conn.execute("ALTER TABLE files ADD COLUMN hash TEXT")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(blocks)")}
+        if 'bloom' not in columns:
+            self.conn.execute("ALTER TABLE blocks ADD COLUMN bloom BLOB")
+        # Sem AUTOINCREMENT o SQLite reaproveita ids de blocos removidos
+        row = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'blocks'").fetchone()
+        self.unique_block_ids = 'AUTOINCREMENT' in row[0].upper()
+        self.with_postings = self.get_meta('postings') != '0'
+        self.with_bloom = self.get_meta('bloom') == '1'
+
+    @staticmethod
+    def path_for(index_dir: str, disk_path: str) -> str:
+        """Caminho do arquivo de índice de um disco."""
+        return os.path.join(index_dir, os.path.basename(disk_path.rstrip('/')) + Config.INDEX_SUFFIX)
+
+    def close(self):
+        self.conn.close()
+
+    def set_meta(self, name: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def get_meta(self, name: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def add_file(self, path: str, trigrams: Optional[TrigramBuilder] = None) -> Tuple[int, int]:
+        """
+        Indexa um arquivo; retorna (linhas, postings). Arquivos compactados
+        têm cada membro indexado como "arquivo!membro", com o tamanho e o
+        mtime do arquivo compactado no manifesto.
+        """
+        st = os.stat(path)
+        if not archive_kind(path):
+            with open(path, 'rb') as f:
+                return self.add_stream(path, f, st, trigrams)
+
+        lines = postings = 0
+        for member, f in iter_members(path):
+            member_lines, member_postings = self.add_stream(f"{path}{MEMBER_SEP}{member}", f, st, trigrams)
+            lines += member_lines
+            postings += member_postings
+        return lines, postings
+
+    def add_stream(
+        self, location: str, f: BinaryIO, st: os.stat_result, trigrams: Optional[TrigramBuilder] = None
+    ) -> Tuple[int, int]:
+        """
+        Indexa o conteúdo de um fluxo; retorna (linhas, postings).
+        Com trigrams ou filtros de Bloom, o conteúdo também é dividido em
+        blocos de ~BLOCK_SIZE bytes (em fronteiras de linha).
+        """
+        cur = self.conn.execute(
+            "INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)",
+            (location, st.st_size, st.st_mtime)
+        )
+        file_id = cur.lastrowid
+
+        digest = hashlib.blake2b(digest_size=16)
+        lines = 0
+        postings = 0
+        batch = []
+        blocks = trigrams is not None or self.with_bloom
+        block_start = 0
+        block_lines = []
+        block_keys: Set[str] = set()
+        for offset, line in iter_lines_with_offsets(f):
+            lines += 1
+            digest.update(line)
+            lowered = line.lower()
+            keys = Tokenizer.keys(lowered)
+            if self.with_postings:
+                for key in keys:
+                    batch.append((key, file_id, offset))
+                if len(batch) >= Config.INSERT_CHUNK:
+                    self._insert_postings(batch)
+                    postings += len(batch)
+                    batch = []
+            if blocks:
+                block_lines.append(lowered)
+                block_keys |= keys
+                if offset + len(line) - block_start >= Config.BLOCK_SIZE:
+                    self._add_block(trigrams, file_id, block_start, block_lines, block_keys)
+                    block_start = offset + len(line)
+                    block_lines = []
+                    block_keys = set()
+        if batch:
+            self._insert_postings(batch)
+            postings += len(batch)
+        if block_lines:
+            self._add_block(trigrams, file_id, block_start, block_lines, block_keys)
+        self.conn.execute("UPDATE files SET hash = ? WHERE id = ?", (digest.hexdigest(), file_id))
+        return lines, postings
+
+    def remove_file(self, file_id: int):
+        """
+        Remove um arquivo do índice. Os ids dos blocos removidos continuam
+        nos segmentos de trigramas, mas como não são reutilizados
+        (AUTOINCREMENT) não geram candidatos; `index --full` compacta os
+        segmentos.
+        """
+        self.conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM blocks WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def remove_path(self, path: str):
+        """Remove um arquivo, ou todos os membros de um arquivo compactado, direto pela tabela `files`."""
+        prefix = path + MEMBER_SEP
+        for (file_id,) in self.conn.execute(
+            "SELECT id FROM files WHERE path = ? OR substr(path, 1, ?) = ?", (path, len(prefix), prefix)
+        ).fetchall():
+            self.remove_file(file_id)
+
+    def remove_location(self, location: str, manifest: Dict[str, Tuple[int, int, float, Optional[str]]]):
+        """Remove um arquivo, ou todos os membros de um arquivo compactado, do índice e do manifesto."""
+        entry = manifest.pop(location, None)
+        if entry is not None:
+            self.remove_file(entry[0])
+        prefix = location + MEMBER_SEP
+        for key in [k for k in manifest if k.startswith(prefix)]:
+            self.remove_file(manifest.pop(key)[0])
+
+    def manifest(self) -> Dict[str, Tuple[int, int, float, Optional[str]]]:
+        """Manifesto atual: {caminho: (id, tamanho, mtime, hash)}."""
+        return {
+            path: (file_id, size, mtime, digest)
+            for file_id, path, size, mtime, digest in self.conn.execute(
+                "SELECT id, path, size, mtime, hash FROM files"
+            )
+        }
+
+    def next_segment(self) -> int:
+        row = self.conn.execute("SELECT COALESCE(MAX(segment) + 1, 0) FROM trigrams").fetchone()
+        return row[0]
+
+    def _add_block(
+        self, trigrams: Optional[TrigramBuilder], file_id: int, offset: int, lines: List[bytes], keys: Set[str]
+    ):
+        data = b''.join(lines)
+        bloom = bytes(BloomFilter.for_keys(keys).bits) if self.with_bloom else None
+        cur = self.conn.execute(
+            "INSERT INTO blocks (file_id, offset, length, bloom) VALUES (?, ?, ?, ?)",
+            (file_id, offset, len(data), bloom)
+        )
+        if trigrams is not None:
+            trigrams.add_block(cur.lastrowid, data)
+
+    def _insert_postings(self, batch: List[Tuple[str, int, int]]):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO postings (key, file_id, offset) VALUES (?, ?, ?)", batch
+        )
+
+    def lookup(self, keys: List[str]) -> Dict[str, List[int]]:
+        """Resolve as chaves em {arquivo: [offsets ordenados]}."""
+        hits: Dict[str, Set[int]] = {}
+        for key in keys:
+            rows = self.conn.execute(
+                "SELECT f.path, p.offset FROM postings p JOIN files f ON f.id = p.file_id WHERE p.key = ?",
+                (key,)
+            )
+            for path, offset in rows:
+                hits.setdefault(path, set()).add(offset)
+        return {path: sorted(offsets) for path, offsets in sorted(hits.items())}
+
+    def bloom_blocks(self, keys: List[str]) -> Tuple[List[Tuple[str, int, int]], int]:
+        """
+        Blocos cujo filtro de Bloom pode conter alguma das chaves.
+        Retorna ([(arquivo, offset, tamanho)], filtros consultados).
+        """
+        # Cada chave passa pelo blake2b uma única vez por consulta, não uma vez por bloco
+        hashed = [BloomFilter.hash_key(key) for key in keys]
+        paths = dict(self.conn.execute("SELECT id, path FROM files"))
+        blocks = []
+        checked = 0
+        for file_id, offset, length, bits in self.conn.execute(
+            "SELECT file_id, offset, length, bloom FROM blocks WHERE bloom IS NOT NULL"
+        ):
+            checked += 1
+            bloom = BloomFilter(bits)
+            if any(bloom.contains_hash(h) for h in hashed):
+                blocks.append((paths[file_id], offset, length))
+        return sorted(blocks), checked
+
+    def has_trigrams(self) -> bool:
+        return self.get_meta('trigrams') == '1'
+
+    def candidate_blocks(self, needle: bytes) -> Optional[List[Tuple[str, int, int]]]:
+        """
+        Intersecta, segmento a segmento, as listas de blocos dos trigramas do
+        termo. Retorna [(arquivo, offset, tamanho)] dos blocos candidatos, ou
+        None se o termo for curto demais para o índice de trigramas.
+        """
+        tris = trigrams_of(needle)
+        if not tris:
+            return None
+
+        per_segment: Optional[Dict[int, Set[int]]] = None
+        # Trigramas mais raros primeiro reduzem o conjunto mais cedo
+        for tri in sorted(tris, key=self._trigram_size):
+            found: Dict[int, Set[int]] = {}
+            for segment, blob in self.conn.execute(
+                "SELECT segment, postings FROM trigrams WHERE tri = ?", (tri,)
+            ):
+                if per_segment is not None and segment not in per_segment:
+                    continue
+                ids = set(decode_postings(blob))
+                if per_segment is not None:
+                    ids &= per_segment[segment]
+                if ids:
+                    found[segment] = ids
+            per_segment = found
+            if not per_segment:
+                return []
+
+        block_ids = sorted(set().union(*per_segment.values()))
+        blocks = []
+        for i in range(0, len(block_ids), 500):
+            chunk = block_ids[i:i + 500]
+            blocks.extend(self.conn.execute(
+                "SELECT f.path, b.offset, b.length FROM blocks b JOIN files f ON f.id = b.file_id "
+                f"WHERE b.id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return sorted(blocks)
+
+    def _trigram_size(self, tri: bytes) -> int:
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(postings)), 0) FROM trigrams WHERE tri = ?", (tri,)
+        ).fetchone()
+        return row[0]
+
+
+def file_hash(path: str) -> str:
+    """Hash do conteúdo do arquivo (o mesmo calculado em LeakIndex.add_file)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_index(
+    disk_path: str, index_dir: str, trigrams: bool = False, full: bool = False,
+    bloom: bool = False, postings: Optional[bool] = None
+) -> Dict[str, float]:
+    """
+    Atualiza o índice de um disco a partir do manifesto ou, com full (ou sem
+    índice utilizável), reconstrói do zero. A reconstrução é montada em um
+    arquivo temporário e só substitui o anterior ao final, então uma
+    interrupção não corrompe o índice existente. Recursos já presentes no
+    índice (trigramas, filtros, postings) são mantidos na reconstrução;
+    postings=None mantém a escolha anterior (postings em índices novos).
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    final_path = LeakIndex.path_for(index_dir, disk_path)
+    if not full and os.path.exists(final_path):
+        index = LeakIndex(final_path)
+        try:
+            had = (index.has_trigrams(), index.with_bloom, index.with_postings)
+            tokenizer = index.get_meta('tokenizer')
+            unique_ids = index.unique_block_ids
+        finally:
+            index.close()
+        missing = [
+            name for name, wanted, present in zip(('trigramas', 'filtros de Bloom', 'postings'),
+                                                   (trigrams, bloom, postings), had)
+            if wanted and not present
+        ]
+        # Chaves geradas por outra versão do Tokenizer não batem com as consultas atuais
+        if tokenizer != str(Tokenizer.VERSION):
+            missing.append(f'chaves v{Tokenizer.VERSION}')
+        # Trigramas de blocos removidos apontariam para blocos novos com o mesmo id
+        if had[0] and not unique_ids:
+            missing.append('ids de bloco únicos')
+        # --no-postings num índice com postings: só a reconstrução remove as chaves
+        dropping = postings is False and had[2]
+        if not missing and not dropping:
+            return update_index(disk_path, final_path)
+        if missing:
+            logger.info(f"{os.path.basename(disk_path)}: índice sem {', '.join(missing)}, reconstruindo")
+        else:
+            logger.info(f"{os.path.basename(disk_path)}: removendo postings (--no-postings), reconstruindo")
+        trigrams = trigrams or had[0]
+        bloom = bloom or had[1]
+        if postings is None:
+            postings = had[2]
+    if postings is None:
+        postings = True
+
+    tmp_path = final_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    start = time.time()
+    stats = {'files': 0, 'lines': 0, 'postings': 0, 'bytes': 0, 'errors': 0}
+    index = LeakIndex(tmp_path)
+    index.conn.execute("PRAGMA synchronous = OFF")
+    index.conn.execute("PRAGMA journal_mode = OFF")
+    index.with_postings = postings
+    index.with_bloom = bloom
+    builder = TrigramBuilder(index.conn) if trigrams else None
+    try:
+        for path in iter_files(disk_path):
+            try:
+                lines, file_postings = index.add_file(path, builder)
+            except READ_ERRORS as e:
+                # Sem journal não há rollback: apaga o que foi gravado antes do erro,
+                # senão o manifesto daria o arquivo como indexado e o `update` o pularia
+                index.remove_path(path)
+                index.conn.commit()
+                logger.warning(f"Erro ao indexar {path}: {e}")
+                stats['errors'] += 1
+                continue
+            index.conn.commit()
+            stats['files'] += 1
+            stats['lines'] += lines
+            stats['postings'] += file_postings
+            stats['bytes'] += os.path.getsize(path)
+            logger.debug(f"Indexado: {path} ({lines} linhas)")
+        if builder:
+            builder.flush()
+        index.set_meta('disk', disk_path)
+        index.set_meta('built_at', datetime.now().isoformat(timespec='seconds'))
+        index.set_meta('trigrams', '1' if trigrams else '0')
+        index.set_meta('bloom', '1' if bloom else '0')
+        index.set_meta('postings', '1' if postings else '0')
+        index.set_meta('tokenizer', str(Tokenizer.VERSION))
+        index.conn.commit()
+    finally:
+        index.close()
+
+    os.replace(tmp_path, final_path)
+    stats['new'] = stats['files']
+    stats['seconds'] = time.time() - start
+    return stats
+
+
+def update_index(disk_path: str, index_path: str) -> Dict[str, float]:
+    """
+    Atualização incremental: compara o disco com o manifesto do índice,
+    reindexa apenas arquivos novos ou alterados e remove os apagados.
+    Arquivos com mesmo tamanho e mtime são considerados inalterados; com
+    mtime diferente e mesmo tamanho, o hash decide (ex.: cópia com touch).
+    Cada arquivo é aplicado em uma transação própria, junto com o seu
+    segmento de trigramas (`index --full` junta os segmentos pequenos).
+    """
+    start = time.time()
+    stats = {'files': 0, 'lines': 0, 'postings': 0, 'bytes': 0, 'errors': 0,
+             'new': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    index = LeakIndex(index_path)
+    builder = TrigramBuilder(index.conn, index.next_segment()) if index.has_trigrams() else None
+    try:
+        manifest = index.manifest()
+        members_of: Dict[str, List[str]] = {}
+        for location in manifest:
+            archive, member = split_location(location)
+            if member is not None:
+                members_of.setdefault(archive, []).append(location)
+
+        for path in iter_files(disk_path):
+            entry = manifest.pop(path, None)
+            try:
+                st = os.stat(path)
+                if archive_kind(path):
+                    # Membros herdam tamanho/mtime do arquivo compactado
+                    entries = [manifest.pop(k) for k in members_of.pop(path, [])]
+                    if entries and all(e[1] == st.st_size and e[2] == st.st_mtime for e in entries):
+                        stats['unchanged'] += 1
+                        continue
+                    for e in entries:
+                        index.remove_file(e[0])
+                    stats['changed' if entries else 'new'] += 1
+                elif entry is not None:
+                    file_id, size, mtime, digest = entry
+                    if st.st_size == size and st.st_mtime == mtime:
+                        stats['unchanged'] += 1
+                        continue
+                    if st.st_size == size and digest and file_hash(path) == digest:
+                        index.conn.execute("UPDATE files SET mtime = ? WHERE id = ?", (st.st_mtime, file_id))
+                        index.conn.commit()
+                        stats['unchanged'] += 1
+                        continue
+                    index.remove_file(file_id)
+                    stats['changed'] += 1
+                else:
+                    stats['new'] += 1
+                lines, file_postings = index.add_file(path, builder)
+                if builder:
+                    # Trigramas do arquivo entram na mesma transação da linha do
+                    # manifesto: uma interrupção não deixa arquivo "em dia" sem eles
+                    builder.flush()
+            except READ_ERRORS as e:
+                index.conn.rollback()
+                if builder:
+                    # Os ids dos blocos desfeitos serão reutilizados pelo próximo arquivo
+                    builder.discard()
+                logger.warning(f"Erro ao indexar {path}: {e}")
+                stats['errors'] += 1
+                continue
+            index.conn.commit()
+            stats['files'] += 1
+            stats['lines'] += lines
+            stats['postings'] += file_postings
+            stats['bytes'] += st.st_size
+            logger.debug(f"Reindexado: {path} ({lines} linhas)")
+
+        # O que sobrou no manifesto não existe mais no disco
+        for path, (file_id, _, _, _) in manifest.items():
+            index.remove_file(file_id)
+            stats['removed'] += 1
+            logger.debug(f"Removido do índice: {path}")
+        index.set_meta('updated_at', datetime.now().isoformat(timespec='seconds'))
+        index.conn.commit()
+    finally:
+        index.close()
+
+    stats['seconds'] = time.time() - start
+    return stats
+
+
+def read_lines_at(location: str, offsets: List[int]) -> Iterator[Tuple[int, bytes]]:
+    """Lê apenas as linhas que começam nos offsets informados (em ordem crescente)."""
+    return read_ranges(location, [(offset, -1) for offset in offsets])
+
+
+def query_disk(
+    index_path: str, term: str, output_file: str, ulp: bool = False, jsonl_file: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Resolve o termo no índice de um disco e grava as linhas encontradas.
+    O casamento é por chave canônica: empresa.com.br encontra também
+    www.empresa.com.br:443, sub.empresa.com.br e android://...@br.com.empresa.
+    """
+    start = time.time()
+    disk_name = os.path.basename(index_path)[:-len(Config.INDEX_SUFFIX)]
+    stats = {'hits': 0, 'candidates': 0, 'files': 0, 'bytes': 0}
+
+    keys = classify_term(term)
+    blocks = None
+    index = LeakIndex(index_path)
+    try:
+        if index.with_postings:
+            candidates = index.lookup(keys)
+        else:
+            blocks, stats['blooms'] = index.bloom_blocks(keys)
+            candidates = {}
+    finally:
+        index.close()
+
+    wanted = set(keys)
+    needles = key_needles(keys)
+    with open_output(output_file, ulp) as out, open_jsonl(jsonl_file, disk_name) as jsonl:
+        if blocks is not None:
+            stats['blocks'] = len(blocks)
+            by_location: Dict[str, List[Tuple[int, int]]] = {}
+            for path, offset, length in blocks:
+                by_location.setdefault(path, []).append((offset, length))
+            stats['files'] = len(by_location)
+            for path, ranges in by_location.items():
+                try:
+                    for block_offset, data in read_ranges(path, ranges):
+                        stats['bytes'] += len(data)
+                        # Filtro diz "talvez": confirma as chaves em cada linha
+                        offset = block_offset
+                        for line in data.splitlines(keepends=True):
+                            line_offset, offset = offset, offset + len(line)
+                            stats['candidates'] += 1
+                            lowered = line.lower()
+                            if not any(n in lowered for n in needles):
+                                continue
+                            if wanted & Tokenizer.keys(lowered):
+                                out.write(line if line.endswith(b'\n') else line + b'\n')
+                                stats['hits'] += 1
+                                if jsonl:
+                                    jsonl.hit(term, path, line_offset, line)
+                except READ_ERRORS as e:
+                    logger.warning(f"Erro ao ler {path}: {e}")
+
+        for path, offsets in candidates.items():
+            stats['files'] += 1
+            stats['candidates'] += len(offsets)
+            try:
+                for offset, line in read_lines_at(path, offsets):
+                    stats['bytes'] += len(line)
+                    # Confirma a chave na linha (protege contra arquivo alterado após o índice)
+                    if wanted & Tokenizer.keys(line.lower()):
+                        out.write(line if line.endswith(b'\n') else line + b'\n')
+                        stats['hits'] += 1
+                        if jsonl:
+                            jsonl.hit(term, path, offset, line)
+            except READ_ERRORS as e:
+                logger.warning(f"Erro ao ler {path}: {e}")
+    if ulp:
+        stats.update(out.stats)
+
+    stats['seconds'] = time.time() - start
+    return stats
+
+
+def match_lines(data: bytes, needle: bytes, base: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Gera (offset, linha) das linhas do trecho que contêm o termo (sem distinção de maiúsculas)."""
+    offset = base
+    for line in data.splitlines(keepends=True):
+        if needle in line.lower():
+            yield offset, line
+        offset += len(line)
+
+
+_matcher_cache: Dict[Tuple[str, ...], MultiMatcher] = {}
+
+
+def scan_archive(path: str, terms: List[str]) -> Tuple[List[Tuple[int, str, int, bytes]], int]:
+    """
+    Varre todos os membros de um arquivo compactado (roda nos processos de
+    descompressão). Retorna ([(índice do termo, membro, offset, linha)],
+    membros lidos).
+    """
+    key = tuple(terms)
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        matcher = _matcher_cache[key] = MultiMatcher(terms)
+    hits = []
+    members = 0
+    for member, f in iter_members(path):
+        members += 1
+        location = f"{path}{MEMBER_SEP}{member}"
+        for offset, line in iter_lines_with_offsets(f):
+            for idx in matcher.find(line):
+                hits.append((idx, location, offset, line))
+    return hits, members
+
+
+def scan_disk(
+    disk_path: str, terms: List[str], emit: Callable[[int, str, int, bytes], None],
+    decompress_workers: int = Config.DECOMPRESS_WORKERS
+) -> Dict[str, int]:
+    """
+    Varre o disco inteiro chamando emit(índice do termo, arquivo, offset,
+    linha) para cada ocorrência. Arquivos comuns são lidos neste processo; os compactados
+    vão para um pool de descompressão (decompress_workers), com no
+    máximo o dobro de workers em andamento para limitar a memória.
+    """
+    matcher = MultiMatcher(terms)
+    stats = {'files': 0, 'archives': 0, 'members': 0, 'bytes': 0}
+    executor = None
+    pending: deque = deque()
+
+    def collect():
+        path, future = pending.popleft()
+        try:
+            hits, members = future.result()
+        except READ_ERRORS as e:
+            logger.warning(f"Erro ao ler {path}: {e}")
+            return
+        for hit in hits:
+            emit(*hit)
+        stats['members'] += members
+
+    try:
+        for path in iter_files(disk_path):
+            try:
+                size = os.path.getsize(path)
+                if archive_kind(path):
+                    if executor is None:
+                        executor = ProcessPoolExecutor(max_workers=decompress_workers)
+                    pending.append((path, executor.submit(scan_archive, path, terms)))
+                    stats['archives'] += 1
+                    while len(pending) > 2 * decompress_workers:
+                        collect()
+                else:
+                    with open(path, 'rb') as f:
+                        for offset, line in iter_lines_with_offsets(f):
+                            for idx in matcher.find(line):
+                                emit(idx, path, offset, line)
+                    stats['files'] += 1
+                stats['bytes'] += size
+            except OSError as e:
+                logger.warning(f"Erro ao ler {path}: {e}")
+        while pending:
+            collect()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    stats['backend'] = matcher.backend
+    return stats
+
+
+def substring_disk(
+    index_path: Optional[str], disk_path: str, term: str, output_file: str, ulp: bool = False,
+    jsonl_file: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Busca um trecho arbitrário no disco. Usa o índice de trigramas para
+    varrer só os blocos candidatos; sem índice de trigramas (ou com termo
+    de menos de 3 bytes) faz a varredura completa do disco.
+    """
+    start = time.time()
+    needle = term.lower().encode('utf-8', 'ignore')
+    disk_name = os.path.basename(disk_path.rstrip('/'))
+    stats = {'hits': 0, 'blocks': 0, 'bytes': 0, 'files': 0, 'full_scan': 0}
+
+    blocks = None
+    if index_path and os.path.exists(index_path):
+        index = LeakIndex(index_path)
+        try:
+            if index.has_trigrams():
+                blocks = index.candidate_blocks(needle)
+        finally:
+            index.close()
+
+    with open_output(output_file, ulp) as out, open_jsonl(jsonl_file, disk_name) as jsonl:
+        def emit(_, location: str, offset: int, line: bytes):
+            out.write(line if line.endswith(b'\n') else line + b'\n')
+            stats['hits'] += 1
+            if jsonl:
+                jsonl.hit(term, location, offset, line)
+
+        if blocks is None:
+            stats['full_scan'] = 1
+            scanned = scan_disk(disk_path, [term], emit)
+            stats['bytes'] = scanned['bytes']
+            stats['files'] = scanned['files'] + scanned['archives']
+        else:
+            by_location: Dict[str, List[Tuple[int, int]]] = {}
+            for path, offset, length in blocks:
+                by_location.setdefault(path, []).append((offset, length))
+            stats['files'] = len(by_location)
+            for path, ranges in by_location.items():
+                try:
+                    for block_offset, data in read_ranges(path, ranges):
+                        stats['blocks'] += 1
+                        stats['bytes'] += len(data)
+                        for offset, line in match_lines(data, needle, block_offset):
+                            emit(0, path, offset, line)
+                except READ_ERRORS as e:
+                    logger.warning(f"Erro ao ler {path}: {e}")
+    if ulp:
+        stats.update(out.stats)
+
+    stats['seconds'] = time.time() - start
+    return stats
+
+
+def batch_disk(
+    disk_path: str, terms: List[str], output_dir: str, ulp: bool = False, jsonl: bool = False,
+    decompress_workers: int = Config.DECOMPRESS_WORKERS
+) -> Dict[str, float]:
+    """
+    Varre o disco uma única vez procurando todos os termos e grava cada linha
+    no arquivo LEAK-<termo>-<disco>.txt de cada termo encontrado nela.
+    Com vários discos em paralelo, decompress_workers é a fatia de CPUs do disco.
+    Só as Config.MAX_OPEN_OUTPUTS saídas usadas mais recentemente ficam
+    abertas; as demais são fechadas e reabertas ao receber a próxima linha.
+    """
+    start = time.time()
+    disk_name = os.path.basename(disk_path.rstrip('/'))
+    stats = {'hits': 0, 'terms_found': 0}
+    outputs = {}
+    recent: OrderedDict = OrderedDict()
+
+    def output_for(idx: int):
+        if idx not in outputs:
+            term_dir = os.path.join(output_dir, safe_name(terms[idx]))
+            os.makedirs(term_dir, exist_ok=True)
+            outputs[idx] = open_output(os.path.join(term_dir, f"LEAK-{safe_name(terms[idx])}-{disk_name}.txt"), ulp)
+        if idx in recent:
+            recent.move_to_end(idx)
+        else:
+            recent[idx] = None
+            if len(recent) > Config.MAX_OPEN_OUTPUTS:
+                outputs[recent.popitem(last=False)[0]].close()
+        return outputs[idx]
+
+    hits_out = JsonlWriter(batch_jsonl_path(output_dir, disk_path), disk_name) if jsonl else None
+
+    def emit(idx: int, location: str, offset: int, line: bytes):
+        output_for(idx).write(line if line.endswith(b'\n') else line + b'\n')
+        stats['hits'] += 1
+        if hits_out:
+            hits_out.hit(terms[idx], location, offset, line)
+
+    try:
+        stats.update(scan_disk(disk_path, terms, emit, decompress_workers))
+        stats['files'] += stats['archives']
+    finally:
+        if hits_out:
+            hits_out.close()
+        for out in outputs.values():
+            out.close()
+    if ulp:
+        stats['ulp_records'] = sum(out.stats['ulp_records'] for out in outputs.values())
+        stats['terms'] = [terms[idx] for idx in outputs]
+
+    stats['terms_found'] = len(outputs)
+    stats['seconds'] = time.time() - start
+    return stats
+
+
+def write_time_log(path: str, start: float, end: float):
+    """Grava o log de tempo no mesmo formato do v2."""
+    duration = int(end - start)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"Início: {datetime.fromtimestamp(start):%Y-%m-%d %H:%M:%S}\n")
+        f.write(f"Fim: {datetime.fromtimestamp(end):%Y-%m-%d %H:%M:%S}\n")
+        f.write(f"Duração: {duration // 60} min {duration % 60} seg\n")
+
+
+def ulp_summary(stats: Dict[str, float]) -> str:
+    """Trecho do log com os registros ULP gravados (vazio sem --ulp)."""
+    if 'ulp_records' not in stats:
+        return ""
+    return f"registros ULP: {stats['ulp_records']} | "
+
+
+def make_scheduler(args, disks: List[str]) -> IOScheduler:
+    """Monta o escalonador de I/O a partir das opções da linha de comando."""
+    scheduler = IOScheduler(
+        disks,
+        hdd_readers=args.hdd_readers,
+        ssd_readers=args.ssd_readers,
+        profiles=dict(args.io_profile or []),
+        max_workers=getattr(args, 'jobs', None),
+    )
+    scheduler.describe()
+    return scheduler
+
+
+def log_throughput(total_bytes: int, seconds: float):
+    """Registra a vazão agregada de todos os discos."""
+    mb_s = total_bytes / 1e6 / seconds if seconds else 0.0
+    logger.info(f"Vazão agregada: {total_bytes / 1e6:.1f} MB em {seconds:.0f}s ({mb_s:.1f} MB/s)")
+
+
+def cmd_index(args) -> int:
+    """Comando `index`: cria ou atualiza o índice de cada disco em paralelo."""
+    if args.no_postings and not args.bloom:
+        logger.error("--no-postings exige --bloom (sem postings nem filtros o índice não responde consultas)")
+        return 1
+    disks = list_disks(args.base_dir, args.disk)
+    if not disks:
+        logger.error("Nenhum disco encontrado para indexar")
+        return 1
+
+    logger.info(f"Indexando {len(disks)} disco(s) em {args.index_dir}")
+    scheduler = make_scheduler(args, disks)
+    failed = 0
+    start = time.time()
+    total_bytes = 0
+    for disk_path, future in scheduler.run(build_index, args.index_dir, args.trigrams, args.full,
+                                           args.bloom, False if args.no_postings else None):
+        disk = os.path.basename(disk_path)
+        try:
+            stats = future.result()
+        except Exception as e:
+            logger.error(f"Falha ao indexar {disk}: {e}")
+            failed += 1
+            continue
+        total_bytes += stats['bytes']
+        mb_s = stats['bytes'] / 1e6 / stats['seconds'] if stats['seconds'] else 0.0
+        logger.info(
+            f"Finalizado: {disk} | novos: {stats['new']} | alterados: {stats.get('changed', 0)} | "
+            f"removidos: {stats.get('removed', 0)} | inalterados: {stats.get('unchanged', 0)} | "
+            f"linhas: {stats['lines']} | postings: {stats['postings']} | {mb_s:.1f} MB/s | {stats['seconds']:.0f}s"
+        )
+    log_throughput(total_bytes, time.time() - start)
+    return 1 if failed else 0
+
+
+def cmd_query(args) -> int:
+    """Comando `query`: busca o termo nos índices de todos os discos."""
+    term = args.term
+    if not classify_term(term):
+        logger.error("Termo de busca vazio")
+        return 1
+
+    # Termos de URL (https://..., android://...) têm "/" e viram nomes seguros
+    safe_term = safe_name(term)
+    output_dir = os.path.join(args.output_dir, safe_term)
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Iniciando busca pelo termo: '{term}'")
+    logger.info(f"Resultados serão salvos em: {output_dir}")
+
+    total = 0
+    for disk in list_disks(args.base_dir, args.disk):
+        disk_name = os.path.basename(disk)
+        index_path = LeakIndex.path_for(args.index_dir, disk)
+        if not os.path.exists(index_path):
+            logger.warning(f"Sem índice para {disk_name}, rode: {sys.argv[0]} index --disk {disk_name}")
+            continue
+
+        output_file = os.path.join(output_dir, f"LEAK-{safe_term}-{disk_name}.txt")
+        jsonl_file = os.path.join(output_dir, f"RESULT-{safe_term}-{disk_name}.jsonl") if args.jsonl else None
+        start = time.time()
+        stats = query_disk(index_path, term, output_file, args.ulp, jsonl_file)
+        write_time_log(os.path.join(output_dir, f"TIME-{safe_term}-{disk_name}.log"), start, time.time())
+        if jsonl_file:
+            write_summary(jsonl_file, disk_name, 'query', [term], start, stats)
+        total += stats['hits']
+        mode = f"candidatas: {stats['candidates']}"
+        if 'blooms' in stats:
+            mode = f"filtros: {stats['blocks']}/{stats['blooms']} bloco(s) talvez | {stats['bytes'] / 1e6:.1f} MB lidos"
+        logger.info(
+            f"Finalizado: {disk_name} | linhas: {stats['hits']} | {mode} | "
+            f"{ulp_summary(stats)}{stats['seconds'] * 1000:.0f} ms"
+        )
+
+    if args.ulp:
+        merge_ulp(output_dir, safe_term)
+    logger.info(f"Busca concluída! {total} linha(s) encontrada(s)")
+    return 0
+
+
+def cmd_substring(args) -> int:
+    """Comando `substring`: busca um trecho arbitrário usando o índice de trigramas."""
+    term = args.term
+    if not term.strip():
+        logger.error("Termo de busca vazio")
+        return 1
+
+    safe_term = safe_name(term)
+    output_dir = os.path.join(args.output_dir, safe_term)
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Iniciando busca pelo trecho: '{term}'")
+    logger.info(f"Resultados serão salvos em: {output_dir}")
+
+    total = 0
+    for disk in list_disks(args.base_dir, args.disk):
+        disk_name = os.path.basename(disk)
+        output_file = os.path.join(output_dir, f"LEAK-{safe_term}-{disk_name}.txt")
+        jsonl_file = os.path.join(output_dir, f"RESULT-{safe_term}-{disk_name}.jsonl") if args.jsonl else None
+        start = time.time()
+        stats = substring_disk(LeakIndex.path_for(args.index_dir, disk), disk, term, output_file, args.ulp,
+                               jsonl_file)
+        write_time_log(os.path.join(output_dir, f"TIME-{safe_term}-{disk_name}.log"), start, time.time())
+        if jsonl_file:
+            write_summary(jsonl_file, disk_name, 'substring', [term], start, stats)
+        total += stats['hits']
+        mode = "varredura completa" if stats['full_scan'] else f"{stats['blocks']} bloco(s) candidato(s)"
+        logger.info(
+            f"Finalizado: {disk_name} | linhas: {stats['hits']} | {mode} | "
+            f"{stats['bytes'] / 1e6:.1f} MB lidos | {ulp_summary(stats)}{stats['seconds'] * 1000:.0f} ms"
+        )
+
+    if args.ulp:
+        merge_ulp(output_dir, safe_term)
+    logger.info(f"Busca concluída! {total} linha(s) encontrada(s)")
+    return 0
+
+
+def cmd_batch(args) -> int:
+    """Comando `batch`: busca todos os termos do arquivo em uma passada por disco."""
+    if not os.path.isfile(args.terms_file):
+        logger.error(f"Arquivo de termos não encontrado: {args.terms_file}")
+        return 1
+    terms = load_terms(args.terms_file)
+    if not terms:
+        logger.error("Nenhum termo no arquivo")
+        return 1
+
+    disks = list_disks(args.base_dir, args.disk)
+    os.makedirs(args.output_dir, exist_ok=True)
+    logger.info(f"Iniciando busca em lote: {len(terms)} termo(s) em {len(disks)} disco(s)")
+    logger.info(f"Resultados serão salvos em: {args.output_dir}/<termo>/")
+    if ahocorasick is None:
+        logger.info("pyahocorasick não instalado, usando Aho–Corasick em Python (pip install pyahocorasick)")
+
+    total = 0
+    total_bytes = 0
+    found_terms: Set[str] = set()
+    if not disks:
+        logger.error("Nenhum disco encontrado")
+        return 1
+    scheduler = make_scheduler(args, disks)
+    # Cada disco em paralelo abre o próprio pool de descompressão: divide as CPUs entre eles
+    decompress_workers = max(1, Config.DECOMPRESS_WORKERS // scheduler.max_workers)
+    batch_start = time.time()
+    for disk, future in scheduler.run(batch_disk, terms, args.output_dir, args.ulp, args.jsonl,
+                                      decompress_workers):
+        disk_name = os.path.basename(disk)
+        try:
+            stats = future.result()
+        except Exception as e:
+            logger.error(f"Falha na busca em {disk_name}: {e}")
+            continue
+        start = time.time() - stats['seconds']
+        write_time_log(os.path.join(args.output_dir, f"TIME-BATCH-{disk_name}.log"), start, time.time())
+        if args.jsonl:
+            write_summary(batch_jsonl_path(args.output_dir, disk), disk_name, 'batch', terms, start, stats)
+        total += stats['hits']
+        total_bytes += stats['bytes']
+        found_terms.update(stats.get('terms', []))
+        mb_s = stats['bytes'] / 1e6 / stats['seconds'] if stats['seconds'] else 0.0
+        logger.info(
+            f"Finalizado: {disk_name} | linhas: {stats['hits']} | termos encontrados: "
+            f"{stats['terms_found']}/{len(terms)} | compactados: {stats['archives']} ({stats['members']} membros) | "
+            f"{ulp_summary(stats)}{mb_s:.1f} MB/s | {stats['seconds']:.0f}s"
+        )
+    log_throughput(total_bytes, time.time() - batch_start)
+
+    for term in sorted(found_terms):
+        merge_ulp(os.path.join(args.output_dir, safe_name(term)), safe_name(term))
+    logger.info(f"Busca concluída! {total} linha(s) encontrada(s)")
+    return 0
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(
+        description='Bird Leak Searcher v3 - Busca em leaks com índice persistente',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+  %(prog)s index
+  %(prog)s index --disk HD01 --disk HD02
+  %(prog)s query empresa.com.br
+  %(prog)s query @empresa.com.br
+  %(prog)s query joao@empresa.com.br
+  %(prog)s index --trigrams
+  %(prog)s index --full
+  %(prog)s index --bloom --no-postings
+  %(prog)s substring "/wp-admin/"
+  %(prog)s batch -T dominios-clientes.txt
+  %(prog)s query empresa.com.br --ulp
+  %(prog)s batch -T dominios-clientes.txt --io-profile HD03=ssd --hdd-readers 1
+  %(prog)s substring "/wp-admin/" --jsonl
+        """
+    )
+    # Opções comuns a todos os comandos
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--base-dir', default=Config.BASE_DIR,
+                        help=f'Diretório com os discos de leak (padrão: {Config.BASE_DIR})')
+    common.add_argument('--index-dir', default=Config.INDEX_DIR,
+                        help=f'Diretório dos índices (padrão: {Config.INDEX_DIR})')
+    common.add_argument('--disk', action='append', default=None,
+                        help='Restringe a um disco (nome do diretório); pode repetir')
+    common.add_argument('-v', '--verbose', action='store_true', help='Modo verbose')
+
+    # Opções do escalonador de I/O (comandos que varrem discos em paralelo)
+    io_opts = argparse.ArgumentParser(add_help=False)
+    io_opts.add_argument('--hdd-readers', type=int, default=Config.HDD_READERS,
+                         help=f'Leitores simultâneos por disco giratório (padrão: {Config.HDD_READERS})')
+    io_opts.add_argument('--ssd-readers', type=int, default=Config.SSD_READERS,
+                         help=f'Leitores simultâneos por SSD (padrão: {Config.SSD_READERS})')
+    io_opts.add_argument('--io-profile', action='append', type=parse_profile, default=None, metavar='NOME=hdd|ssd',
+                         help='Força o tipo de um disco ou dispositivo (ex.: HD01=hdd, sdb=ssd); pode repetir')
+
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_index = sub.add_parser('index', parents=[common, io_opts], help='Cria ou atualiza o índice invertido de cada disco')
+    p_index.add_argument('-j', '--jobs', type=int, default=None,
+                         help='Limite total de discos indexados em paralelo (padrão: o do escalonador)')
+    p_index.add_argument('--trigrams', action='store_true',
+                         help='Também monta o índice de trigramas para o comando substring')
+    p_index.add_argument('--bloom', action='store_true',
+                         help='Monta um filtro de Bloom por bloco para descartar blocos sem o termo')
+    p_index.add_argument('--no-postings', action='store_true',
+                         help='Não grava o índice invertido (só filtros de Bloom; índice bem menor)')
+    p_index.add_argument('--full', action='store_true',
+                         help='Reconstrói o índice do zero em vez de atualizar pelo manifesto')
+    p_index.set_defaults(func=cmd_index)
+
+    p_query = sub.add_parser('query', parents=[common], help='Busca um domínio, email ou login no índice')
+    p_query.add_argument('term', help='Termo procurado (domínio, @domínio, email ou login)')
+    p_query.add_argument('-o', '--output-dir', default=Config.OUTPUT_DIR,
+                         help=f'Diretório de saída (padrão: {Config.OUTPUT_DIR})')
+    p_query.add_argument('--ulp', action='store_true',
+                         help='Grava registros URL/login/senha deduplicados (parser do cleaner v2)')
+    p_query.add_argument('--jsonl', action='store_true',
+                         help='Também grava o fluxo JSONL de hits e o resumo por disco (RESULT-*.jsonl)')
+    p_query.set_defaults(func=cmd_query)
+
+    p_sub = sub.add_parser('substring', parents=[common], help='Busca um trecho arbitrário (índice de trigramas)')
+    p_sub.add_argument('term', help='Trecho procurado (sem distinção de maiúsculas)')
+    p_sub.add_argument('-o', '--output-dir', default=Config.OUTPUT_DIR,
+                       help=f'Diretório de saída (padrão: {Config.OUTPUT_DIR})')
+    p_sub.add_argument('--ulp', action='store_true',
+                       help='Grava registros URL/login/senha deduplicados (parser do cleaner v2)')
+    p_sub.add_argument('--jsonl', action='store_true',
+                       help='Também grava o fluxo JSONL de hits e o resumo por disco (RESULT-*.jsonl)')
+    p_sub.set_defaults(func=cmd_substring)
+
+    p_batch = sub.add_parser('batch', parents=[common, io_opts], help='Busca vários termos em uma única passada')
+    p_batch.add_argument('-T', '--terms-file', required=True, help='Arquivo com um termo por linha')
+    p_batch.add_argument('-o', '--output-dir', default=Config.OUTPUT_DIR,
+                         help=f'Diretório de saída (padrão: {Config.OUTPUT_DIR})')
+    p_batch.add_argument('--ulp', action='store_true',
+                         help='Grava registros URL/login/senha deduplicados (parser do cleaner v2)')
+    p_batch.add_argument('--jsonl', action='store_true',
+                         help='Também grava o fluxo JSONL de hits e o resumo por disco (RESULT-*.jsonl)')
+    p_batch.set_defaults(func=cmd_batch)
+
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Bird Ollama Mock - Servidor local que imita a API /api/generate do Ollama
+
+Permite testar e medir o pipeline do bird-leak-cleaner-ai sem GPU: a resposta
+(JSON ou TSV do modo compacto) é gerada por um parser simples e o tempo de
+resposta é simulado a partir de uma latência fixa e de taxas de tokens
+configuráveis. Tokens enviados via "context" contam como cache.
+
+Uso:
+    bird-ollama-mock.py --port 11435 --latency 0.2 --token-rate 40
+    bird-ollama-mock.py --port 11435 --malformed-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Configurações padrão
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 11435
+DEFAULT_LATENCY = 0.2
+DEFAULT_TOKEN_RATE = 40.0
+DEFAULT_PROMPT_RATE = 1500.0
+DEFAULT_PARALLEL = 4
+CHARS_PER_TOKEN = 4
+
+LINE_PATTERN = re.compile(r'^(\d+)\. (.*)$')
+URL_PATTERN = re.compile(r'^(https?://[^\s|;]+?|[a-zA-Z0-9][a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?::\d+)?(?:/[^\s|;:]*)?)[\s|;:]+(.*)$')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token)."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def extract_prompt_lines(prompt: str) -> list[tuple[int, str]]:
+    """Extrai as linhas numeradas ("1. conteúdo") enviadas no prompt."""
+    lines = []
+    for raw in prompt.splitlines():
+        match = LINE_PATTERN.match(raw)
+        if match:
+            lines.append((int(match.group(1)), match.group(2)))
+    return lines
+
+
+def mock_parse(line: str) -> dict:
+    """Separação simples em url/login/senha, suficiente para simular o modelo."""
+    url = ""
+    rest = line.strip()
+    match = URL_PATTERN.match(rest)
+    if match:
+        url, rest = match.group(1), match.group(2)
+
+    login, password = rest, ""
+    for sep in ('|', ';', ':', ' '):
+        if sep in rest:
+            login, password = rest.split(sep, 1)
+            break
+    return {"url": url, "login": login.strip(), "password": password.strip()}
+
+
+def build_response(prompt: str) -> str:
+    """Monta a resposta no formato pedido pelo prompt (JSON ou TSV do modo compacto)."""
+    lines = extract_prompt_lines(prompt)
+    if not lines:
+        return "OK"
+
+    if "TSV" in prompt:
+        rows = []
+        for num, line in lines:
+            r = mock_parse(line)
+            rows.append(f"{num}\t{r['url']}\t{r['login']}\t{r['password']}")
+        return "\n".join(rows)
+
+    items = []
+    for num, line in lines:
+        item = {"line": num}
+        item.update(mock_parse(line))
+        items.append(item)
+    return json.dumps(items, ensure_ascii=False, indent=2)
+
+
+def malform(response: str, rng: random.Random) -> str:
+    """Corrompe a resposta imitando falhas comuns de LLM."""
+    kind = rng.choice(("truncate", "prose", "trailing_comma"))
+    if kind == "truncate":
+        return response[:max(1, len(response) // 2)]
+    if kind == "prose":
+        return "Claro! Aqui está a análise das linhas solicitadas, separadas por campo."
+    return response.replace("}\n]", "},\n]")
+
+
+class MockState:
+    """Configuração e contadores compartilhados entre as requisições."""
+
+    def __init__(self, latency, token_rate, prompt_rate, malformed_rate, parallel, seed=None):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.prompt_rate = prompt_rate
+        self.malformed_rate = malformed_rate
+        self.slots = threading.Semaphore(max(1, parallel))
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "malformed": 0, "prompt_tokens": 0, "eval_tokens": 0}
+
+    def generation_time(self, prompt_tokens: int, eval_tokens: int) -> float:
+        """Tempo simulado de avaliação do prompt + geração da resposta."""
+        seconds = self.latency
+        if self.prompt_rate > 0:
+            seconds += prompt_tokens / self.prompt_rate
+        if self.token_rate > 0:
+            seconds += eval_tokens / self.token_rate
+        return seconds
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Handler HTTP com as rotas mínimas da API do Ollama."""
+
+    server_version = "BirdOllamaMock/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "mock:latest"}]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "mock"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        state: MockState = self.server.state
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {"error": "invalid json"})
+            return
+
+        prompt = payload.get("prompt", "")
+        context = payload.get("context") or []
+        response = build_response(prompt)
+
+        with state.lock:
+            malformed = state.rng.random() < state.malformed_rate
+            if malformed:
+                response = malform(response, state.rng)
+
+        # Tokens já presentes no context vêm do cache e não são reavaliados
+        prompt_tokens = estimate_tokens(prompt)
+        eval_tokens = estimate_tokens(response)
+
+        # Simula um servidor com número limitado de slots de geração
+        start = time.perf_counter()
+        with state.slots:
+            time.sleep(state.generation_time(prompt_tokens, eval_tokens))
+        elapsed = time.perf_counter() - start
+
+        with state.lock:
+            state.stats["requests"] += 1
+            state.stats["malformed"] += int(malformed)
+            state.stats["prompt_tokens"] += prompt_tokens
+            state.stats["eval_tokens"] += eval_tokens
+
+        self._send_json(200, {
+            "model": payload.get("model", "mock"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": response,
+            "done": True,
+            "total_duration": int(elapsed * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": eval_tokens,
+            "context": list(context) + [0] * (prompt_tokens + eval_tokens),
+        })
+
+
+def create_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    latency: float = DEFAULT_LATENCY,
+    token_rate: float = DEFAULT_TOKEN_RATE,
+    prompt_rate: float = DEFAULT_PROMPT_RATE,
+    malformed_rate: float = 0.0,
+    parallel: int = DEFAULT_PARALLEL,
+    seed: int = None,
+) -> ThreadingHTTPServer:
+    """Cria o servidor (port=0 escolhe uma porta livre)."""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.state = MockState(latency, token_rate, prompt_rate, malformed_rate, parallel, seed)
+    return server
+
+
+def start_in_thread(**kwargs) -> ThreadingHTTPServer:
+    """Inicia o servidor em uma thread daemon e retorna a instância."""
+    server = create_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bird Ollama Mock - Simulador local da API /api/generate",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  bird-ollama-mock.py --port 11435
+  bird-ollama-mock.py --latency 0.5 --token-rate 25 --malformed-rate 0.05
+        """
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Endereço de escuta (padrão: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Porta (padrão: {DEFAULT_PORT})')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY,
+                        help=f'Latência fixa por requisição em segundos (padrão: {DEFAULT_LATENCY})')
+    parser.add_argument('--token-rate', type=float, default=DEFAULT_TOKEN_RATE,
+                        help=f'Tokens gerados por segundo, 0 = instantâneo (padrão: {DEFAULT_TOKEN_RATE})')
+    parser.add_argument('--prompt-rate', type=float, default=DEFAULT_PROMPT_RATE,
+                        help=f'Tokens de prompt avaliados por segundo, 0 = instantâneo (padrão: {DEFAULT_PROMPT_RATE})')
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help='Fração de respostas com JSON inválido (padrão: 0.0)')
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL,
+                        help=f'Requisições geradas simultaneamente (padrão: {DEFAULT_PARALLEL})')
+    parser.add_argument('--seed', type=int, default=None, help='Semente para respostas inválidas reproduzíveis')
+    args = parser.parse_args()
+
+    server = create_server(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        token_rate=args.token_rate,
+        prompt_rate=args.prompt_rate,
+        malformed_rate=args.malformed_rate,
+        parallel=args.parallel,
+        seed=args.seed,
+    )
+    host, port = server.server_address[:2]
+    print(f"🤖 Mock Ollama em http://{host}:{port}/api/generate")
+    print(f"   Latência: {args.latency}s | Tokens/s: {args.token_rate} | JSON inválido: {args.malformed_rate:.0%}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.state.stats
+        print(f"\n📊 Requisições: {stats['requests']} | Inválidas: {stats['malformed']} | "
+              f"Tokens prompt: {stats['prompt_tokens']} | Tokens gerados: {stats['eval_tokens']}")
+
+
+if __name__ == "__main__":
+    main()